@@ -2,8 +2,19 @@ import random
 import math
 import numpy as np
 import time # Import time module
+from constants import DEBUG
 from board import Board, EMPTY, BLACK as BOARD_BLACK, WHITE as BOARD_WHITE
 
+try:
+    from numba import njit, prange, config as numba_config # Optional: compiles the evaluation kernel to machine code
+    SWEEP_CHUNKS = numba_config.NUMBA_NUM_THREADS # One scratch grid per worker thread
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: the kernel runs as plain Python."""
+        return lambda func: func
+    prange = range
+    SWEEP_CHUNKS = 1
+
 # Define players for Zobrist hashing (map board state to index)
 ZOBRIST_PLAYERS = {BOARD_BLACK: 0, BOARD_WHITE: 1, EMPTY: 2}
 NUM_ZOBRIST_PLAYERS = 2 # Only hash for Black and White stones
@@ -32,38 +43,38 @@ class AIEasy(AIBase):
     """AI that plays completely randomly among valid empty cells."""
     def find_move(self, board: Board, move_count):
         """Finds a random *valid* move respecting opening and forbidden rules."""
-        print(f"DEBUG [AIEasy]: find_move called. Player: {self.player}, Move Count: {move_count}") # DEBUG
+        if DEBUG: print(f"DEBUG [AIEasy]: find_move called. Player: {self.player}, Move Count: {move_count}") # DEBUG
         empty_cells = board.get_empty_cells()
         if not empty_cells:
-            print("DEBUG [AIEasy]: No empty cells.") # DEBUG
+            if DEBUG: print("DEBUG [AIEasy]: No empty cells.") # DEBUG
             return None
 
         # Filter empty cells to get only valid moves
         valid_moves = []
-        print(f"DEBUG [AIEasy]: Checking {len(empty_cells)} empty cells for validity...") # DEBUG
+        if DEBUG: print(f"DEBUG [AIEasy]: Checking {len(empty_cells)} empty cells for validity...") # DEBUG
         for r, c in empty_cells:
-            print(f"DEBUG [AIEasy]: Checking validity of ({r}, {c}) with move_count {move_count}...") # DEBUG
+            if DEBUG: print(f"DEBUG [AIEasy]: Checking validity of ({r}, {c}) with move_count {move_count}...") # DEBUG
             is_valid = board.is_valid_move(r, c, self.player, move_count)
-            print(f"DEBUG [AIEasy]: Result for ({r}, {c}): {is_valid}") # DEBUG
+            if DEBUG: print(f"DEBUG [AIEasy]: Result for ({r}, {c}): {is_valid}") # DEBUG
             if is_valid:
                 valid_moves.append((r, c))
 
         if valid_moves:
             chosen_move = random.choice(valid_moves)
-            print(f"DEBUG [AIEasy]: Found {len(valid_moves)} valid moves. Choosing: {chosen_move}") # DEBUG
+            if DEBUG: print(f"DEBUG [AIEasy]: Found {len(valid_moves)} valid moves. Choosing: {chosen_move}") # DEBUG
             return chosen_move
         else:
-            print("DEBUG [AIEasy]: No valid moves found.") # DEBUG
+            if DEBUG: print("DEBUG [AIEasy]: No valid moves found.") # DEBUG
             return None # No valid moves exist
 
 
 class AINormal(AIBase):
     """AI that checks for immediate wins, blocks, threats, then random."""
     def find_move(self, board: Board, move_count):
-        print(f"DEBUG [AINormal]: find_move called. Player: {self.player}, Move Count: {move_count}") # DEBUG
+        if DEBUG: print(f"DEBUG [AINormal]: find_move called. Player: {self.player}, Move Count: {move_count}") # DEBUG
         empty_cells = board.get_empty_cells()
         if not empty_cells:
-            print("DEBUG [AINormal]: No empty cells.") # DEBUG
+            if DEBUG: print("DEBUG [AINormal]: No empty cells.") # DEBUG
             return None
 
         opponent = self.opponent
@@ -619,155 +630,270 @@ class AIHard(AIBase):
            Higher score is better for the AI player (self.player).
            Adds extra penalties for critical opponent threats.
         """
-        total_score = 0
-        opponent_open_three_penalty = self.PATTERN_SCORES["o_open_three"] * 2 # Extra penalty multiplier
-        opponent_open_four_penalty = self.PATTERN_SCORES["o_open_four"] * 2 # Extra penalty multiplier
-        # Add similar large bonus for player's open four/three? Maybe later.
-
-        # Check all lines: horizontal, vertical, diagonals
-        lines = self._get_all_lines(board)
-
-        critical_threat_found = False # Flag to check if immediate loss was already evaluated
-
-        for line in lines:
-            # Use the updated evaluate_line method (returning max absolute score)
-            line_eval_score = self._evaluate_line(line)
-
-            # Check for immediate win/loss first
-            if line_eval_score >= self.PATTERN_SCORES["p_win"] : return self.PATTERN_SCORES["p_win"]
-            if line_eval_score <= self.PATTERN_SCORES["o_win"] : return self.PATTERN_SCORES["o_win"]
-
-            # Add the line score (likely the most significant pattern's score)
-            total_score += line_eval_score
-
-            # Apply extra penalty if critical opponent threats are the dominant pattern in the line
-            if line_eval_score == self.PATTERN_SCORES["o_open_four"]:
-                 total_score += opponent_open_four_penalty # Add extra penalty
-                 critical_threat_found = True
-                 # print(f"DEBUG Eval Board: Extra penalty applied for Opponent Open Four. New total: {total_score}")
-            elif line_eval_score == self.PATTERN_SCORES["o_open_three"]:
-                 total_score += opponent_open_three_penalty # Add extra penalty
-                 critical_threat_found = True
-                 # print(f"DEBUG Eval Board: Extra penalty applied for Opponent Open Three. New total: {total_score}")
-
-        # If no critical threats were found via max_abs_score in _evaluate_line,
-        # maybe do a simpler check for their existence? (Less accurate due to overlap)
-        # For now, rely on _evaluate_line returning the critical score if it's dominant.
-
-        # Add a small bonus/penalty for center control (optional)
-        # center = board.size // 2
-        # if board.grid[center, center] == self.player: total_score += 5
-        # elif board.grid[center, center] == self.opponent: total_score -= 5
-
-        return total_score
-
-    def _get_all_lines(self, board: Board):
-        """Extracts all rows, columns, and diagonals from the board."""
-        lines = []
-        size = board.size
-        grid = board.grid
-
-        # Rows
-        for r in range(size):
-            lines.append(list(grid[r, :]))
-        # Columns
-        for c in range(size):
-            lines.append(list(grid[:, c]))
-        # Diagonals (top-left to bottom-right)
-        for k in range(-size + 1, size):
-            lines.append(list(grid.diagonal(k)))
-        # Diagonals (top-right to bottom-left)
-        # Use fliplr to get anti-diagonals
-        grid_flipped = board.grid[:, ::-1]
-        for k in range(-size + 1, size):
-            lines.append(list(grid_flipped.diagonal(k)))
-
-        return lines
-
-    def _evaluate_line(self, line: list):
-        """
-        Evaluates a single line, focusing on win/loss and critical four-patterns.
-        Returns the score of the most critical pattern found (max absolute value), or 0.
-        """
-        n = len(line)
-        p = self.player
-        o = self.opponent
-        e = EMPTY
-        found_scores = []
-
-        # Define patterns to check (Win, Fours, Threes only)
-        patterns_to_check = {
-            # Win
-            (p, p, p, p, p): self.PATTERN_SCORES["p_win"],
-            (o, o, o, o, o): self.PATTERN_SCORES["o_win"],
-            # Open Four
-            (e, p, p, p, p, e): self.PATTERN_SCORES["p_open_four"],
-            (e, o, o, o, o, e): self.PATTERN_SCORES["o_open_four"],
-            # Closed Four
-            (o, p, p, p, p, e): self.PATTERN_SCORES["p_closed_four"],
-            (e, p, p, p, p, o): self.PATTERN_SCORES["p_closed_four"],
-            (p, o, o, o, o, e): self.PATTERN_SCORES["o_closed_four"],
-            (e, o, o, o, o, p): self.PATTERN_SCORES["o_closed_four"],
-            # Open Three
-            (e, p, p, p, e): self.PATTERN_SCORES["p_open_three"],
-            (e, o, o, o, e): self.PATTERN_SCORES["o_open_three"],
-            # Broken Three
-            (e, p, p, e, p, e): self.PATTERN_SCORES["p_broken_three"],
-            (e, p, e, p, p, e): self.PATTERN_SCORES["p_broken_three"],
-            (e, o, o, e, o, e): self.PATTERN_SCORES["o_broken_three"],
-            (e, o, e, o, o, e): self.PATTERN_SCORES["o_broken_three"],
-            # Closed Three
-            (o, p, p, p, e): self.PATTERN_SCORES["p_closed_three"],
-            (e, p, p, p, o): self.PATTERN_SCORES["p_closed_three"],
-            (p, o, o, o, e): self.PATTERN_SCORES["o_closed_three"],
-            (e, o, o, o, p): self.PATTERN_SCORES["o_closed_three"],
-        }
-        # Simplified Edge Closed Fours
-        if n >= 5:
-            if tuple(line[:5]) == (p, p, p, p, e): patterns_to_check[(p,p,p,p,e)] = self.PATTERN_SCORES["p_closed_four"]
-            if tuple(line[n-5:]) == (e, p, p, p, p): patterns_to_check[(e,p,p,p,p)] = self.PATTERN_SCORES["p_closed_four"]
-            if tuple(line[:5]) == (o, o, o, o, e): patterns_to_check[(o,o,o,o,e)] = self.PATTERN_SCORES["o_closed_four"]
-            if tuple(line[n-5:]) == (e, o, o, o, o): patterns_to_check[(e,o,o,o,o)] = self.PATTERN_SCORES["o_closed_four"]
-        # Simplified Edge Closed Threes
-        if n >= 4:
-            if tuple(line[:4]) == (p, p, p, e): patterns_to_check[(p,p,p,e)] = self.PATTERN_SCORES["p_closed_three"]
-            if tuple(line[n-4:]) == (e, p, p, p): patterns_to_check[(e,p,p,p)] = self.PATTERN_SCORES["p_closed_three"]
-            if tuple(line[:4]) == (o, o, o, e): patterns_to_check[(o,o,o,e)] = self.PATTERN_SCORES["o_closed_three"]
-            if tuple(line[n-4:]) == (e, o, o, o): patterns_to_check[(e,o,o,o)] = self.PATTERN_SCORES["o_closed_three"]
-
-        # Sort by length descending (helps prioritize win/longer patterns)
-        sorted_patterns = sorted(patterns_to_check.items(), key=lambda item: len(item[0]), reverse=True)
-
-        # Iterate through the line using greedy approach
-        i = 0
-        while i < n:
-            found_pattern_at_i = False
-            for pattern_tuple, score in sorted_patterns:
-                pattern_len = len(pattern_tuple)
-                if i + pattern_len <= n:
-                    segment = tuple(line[i : i + pattern_len])
-                    if segment == pattern_tuple:
-                        found_scores.append(score)
-                        # If win/loss, return immediately
-                        if score >= self.PATTERN_SCORES["p_win"] or score <= self.PATTERN_SCORES["o_win"]:
-                             return score
-                        i += pattern_len # Advance past found pattern
-                        found_pattern_at_i = True
-                        break
-            if not found_pattern_at_i:
-                i += 1
-
-        # Return score with max absolute value
-        if not found_scores:
-            return 0
+        return int(_evaluate_grid(board.grid, self.player))
+
+
+# --- Compiled evaluation kernel --- #
+# Line patterns (win, fours, threes) encoded relative to the evaluated
+# player: 0 = empty, 1 = player, 2 = opponent. Rows are in the order the
+# greedy scan tries them: longest first, then by priority.
+# Edge kinds: 0 = always checked, 1 = only if the line starts with it,
+# 2 = only if the line ends with it.
+_LINE_PATTERNS = [
+    # (codes, score name, edge kind)
+    ((0, 1, 1, 1, 1, 0), "p_open_four", 0),
+    ((0, 2, 2, 2, 2, 0), "o_open_four", 0),
+    ((2, 1, 1, 1, 1, 0), "p_closed_four", 0),
+    ((0, 1, 1, 1, 1, 2), "p_closed_four", 0),
+    ((1, 2, 2, 2, 2, 0), "o_closed_four", 0),
+    ((0, 2, 2, 2, 2, 1), "o_closed_four", 0),
+    ((0, 1, 1, 0, 1, 0), "p_broken_three", 0),
+    ((0, 1, 0, 1, 1, 0), "p_broken_three", 0),
+    ((0, 2, 2, 0, 2, 0), "o_broken_three", 0),
+    ((0, 2, 0, 2, 2, 0), "o_broken_three", 0),
+    ((1, 1, 1, 1, 1), "p_win", 0),
+    ((2, 2, 2, 2, 2), "o_win", 0),
+    ((0, 1, 1, 1, 0), "p_open_three", 0),
+    ((0, 2, 2, 2, 0), "o_open_three", 0),
+    ((2, 1, 1, 1, 0), "p_closed_three", 0),
+    ((0, 1, 1, 1, 2), "p_closed_three", 0),
+    ((1, 2, 2, 2, 0), "o_closed_three", 0),
+    ((0, 2, 2, 2, 1), "o_closed_three", 0),
+    ((1, 1, 1, 1, 0), "p_closed_four", 1), # Edge closed fours
+    ((0, 1, 1, 1, 1), "p_closed_four", 2),
+    ((2, 2, 2, 2, 0), "o_closed_four", 1),
+    ((0, 2, 2, 2, 2), "o_closed_four", 2),
+    ((1, 1, 1, 0), "p_closed_three", 1), # Edge closed threes
+    ((0, 1, 1, 1), "p_closed_three", 2),
+    ((2, 2, 2, 0), "o_closed_three", 1),
+    ((0, 2, 2, 2), "o_closed_three", 2),
+]
+_PAT_CODES = np.full((len(_LINE_PATTERNS), 6), -1, dtype=np.int8)
+for _i, (_codes, _name, _kind) in enumerate(_LINE_PATTERNS):
+    _PAT_CODES[_i, :len(_codes)] = _codes
+_PAT_LENS = np.array([len(codes) for codes, _, _ in _LINE_PATTERNS], dtype=np.int64)
+_PAT_SCORES = np.array([AIHard.PATTERN_SCORES[name] for _, name, _ in _LINE_PATTERNS], dtype=np.int64)
+_PAT_EDGE = np.array([kind for _, _, kind in _LINE_PATTERNS], dtype=np.int64)
+_P_WIN = AIHard.PATTERN_SCORES["p_win"]
+_O_WIN = AIHard.PATTERN_SCORES["o_win"]
+_O_OPEN_FOUR = AIHard.PATTERN_SCORES["o_open_four"]
+_O_OPEN_THREE = AIHard.PATTERN_SCORES["o_open_three"]
+
+
+@njit(cache=True, nogil=True)
+def _pattern_at(codes, start, k):
+    """True if pattern k matches codes starting at index start."""
+    for j in range(_PAT_LENS[k]):
+        if codes[start + j] != _PAT_CODES[k, j]:
+            return False
+    return True
+
+
+@njit(cache=True, nogil=True)
+def _score_line_codes(codes, n, active):
+    """
+    Evaluates one encoded line with a greedy left-to-right pattern scan.
+    Returns the score of the most critical pattern found (max absolute value), or 0.
+    """
+    num_patterns = _PAT_LENS.shape[0]
+    # Edge patterns only take part if the line starts/ends with them
+    for k in range(num_patterns):
+        plen = _PAT_LENS[k]
+        if _PAT_EDGE[k] == 0:
+            active[k] = True
+        elif plen > n:
+            active[k] = False
+        elif _PAT_EDGE[k] == 1:
+            active[k] = _pattern_at(codes, 0, k)
+        else:
+            active[k] = _pattern_at(codes, n - plen, k)
+
+    best = 0
+    best_abs = 0
+    i = 0
+    while i < n:
+        matched_len = 0
+        first = codes[i]
+        for k in range(num_patterns):
+            # Cheap first-cell test before the full comparison
+            if first != _PAT_CODES[k, 0] or not active[k]:
+                continue
+            plen = _PAT_LENS[k]
+            if i + plen <= n and _pattern_at(codes, i, k):
+                score = _PAT_SCORES[k]
+                if score >= _P_WIN or score <= _O_WIN:
+                    return score
+                if abs(score) > best_abs:
+                    best_abs = abs(score)
+                    best = score
+                matched_len = plen
+                break
+        i += matched_len if matched_len > 0 else 1
+    return best
+
+
+@njit(cache=True, nogil=True)
+def _score_grid_line(grid, codes, active, r, c, dr, dc, n, player):
+    """Encodes the n cells from (r, c) along (dr, dc) and scores them."""
+    for k in range(n):
+        v = grid[r + k * dr, c + k * dc]
+        if v == EMPTY:
+            codes[k] = 0
+        elif v == player:
+            codes[k] = 1
+        else:
+            codes[k] = 2
+    return _score_line_codes(codes, n, active)
+
+
+@njit(cache=True, nogil=True)
+def _add_line_score(total, line_score):
+    """Adds a line score, with extra penalties for critical opponent threats."""
+    total += line_score
+    if line_score == _O_OPEN_FOUR:
+        total += _O_OPEN_FOUR * 2 # Extra penalty for critical opponent threats
+    elif line_score == _O_OPEN_THREE:
+        total += _O_OPEN_THREE * 2
+    return total
+
+
+@njit(cache=True, nogil=True)
+def _line_geometry(line, size):
+    """Start cell, direction and length of line number `line` (see _evaluate_grid)."""
+    if line < size: # Rows
+        return line, 0, 0, 1, size
+    if line < 2 * size: # Columns
+        return 0, line - size, 1, 0, size
+    if line < 4 * size - 1: # Diagonals, k = -size+1 .. size-1
+        k = line - 2 * size - (size - 1)
+        if k >= 0:
+            return 0, k, 1, 1, size - k
+        return -k, 0, 1, 1, size + k
+    # Anti-diagonals of the left-right flipped grid
+    k = line - (4 * size - 1) - (size - 1)
+    if k >= 0:
+        return 0, size - 1 - k, 1, -1, size - k
+    return -k, size - 1, 1, -1, size + k
+
+
+@njit(cache=True, nogil=True)
+def _line_through(r, c, direction, size):
+    """Line number of the row/column/diagonal/anti-diagonal (direction 0-3) through (r, c)."""
+    if direction == 0:
+        return r
+    if direction == 1:
+        return size + c
+    if direction == 2:
+        return 2 * size + (size - 1) + (c - r)
+    return 4 * size - 1 + (size - 1) + (size - 1 - c - r)
+
+
+@njit(cache=True, nogil=True)
+def _evaluate_grid(grid, player):
+    """
+    Evaluates the grid based on patterns found in all lines (rows, columns,
+    diagonals, anti-diagonals). Higher score is better for player.
+    """
+    size = grid.shape[0]
+    codes = np.empty(size, dtype=np.int8)
+    active = np.empty(_PAT_LENS.shape[0], dtype=np.bool_)
+    total = 0
+    for line in range(6 * size - 2): # size rows + size columns + 2 * (2 * size - 1) diagonals
+        r, c, dr, dc, n = _line_geometry(line, size)
+        line_score = _score_grid_line(grid, codes, active, r, c, dr, dc, n, player)
+        if line_score >= _P_WIN:
+            return _P_WIN
+        if line_score <= _O_WIN:
+            return _O_WIN
+        total = _add_line_score(total, line_score)
+    return total
+
+
+@njit(cache=True, nogil=True)
+def _evaluate_move(grid, r, c, player, base_scores, base_total, terminal_lines, codes, active):
+    """
+    Same result as _evaluate_grid with player's stone at (r, c), but only the
+    four lines through (r, c) are re-scored; all other lines keep their
+    base_scores. grid is restored before returning.
+    """
+    size = grid.shape[0]
+    num_lines = base_scores.shape[0]
+    previous = grid[r, c]
+    grid[r, c] = player
+    total = base_total
+    first_terminal = num_lines # First win/loss line in visiting order, if any
+    terminal_score = 0
+    line0 = line1 = line2 = line3 = -1
+    for direction in range(4):
+        line = _line_through(r, c, direction, size)
+        if direction == 0:
+            line0 = line
+        elif direction == 1:
+            line1 = line
+        elif direction == 2:
+            line2 = line
         else:
-            max_abs_score = 0
-            final_score = 0
-            for s in found_scores:
-                if abs(s) > max_abs_score:
-                    max_abs_score = abs(s)
-                    final_score = s
-            return final_score
+            line3 = line
+        r0, c0, dr, dc, n = _line_geometry(line, size)
+        line_score = _score_grid_line(grid, codes, active, r0, c0, dr, dc, n, player)
+        total = _add_line_score(total - _add_line_score(0, base_scores[line]), line_score)
+        if (line_score >= _P_WIN or line_score <= _O_WIN) and line < first_terminal:
+            first_terminal = line
+            terminal_score = line_score
+    grid[r, c] = previous
+
+    # An unchanged win/loss line that comes earlier still decides the result
+    for line in terminal_lines:
+        if line >= first_terminal:
+            break
+        if line != line0 and line != line1 and line != line2 and line != line3:
+            first_terminal = line
+            terminal_score = base_scores[line]
+            break
+    if first_terminal < num_lines:
+        return _P_WIN if terminal_score >= _P_WIN else _O_WIN
+    return total
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def _evaluate_moves(grid, rs, cs, player, out):
+    """Evaluates every candidate (rs[i], cs[i]) for player into out[i], in parallel."""
+    size = grid.shape[0]
+    num_patterns = _PAT_LENS.shape[0]
+    codes = np.empty(size, dtype=np.int8)
+    active = np.empty(num_patterns, dtype=np.bool_)
+
+    # Score every line of the current grid once; a candidate only changes its own four lines
+    base_scores = np.empty(6 * size - 2, dtype=np.int64)
+    base_total = 0
+    for line in range(base_scores.shape[0]):
+        r0, c0, dr, dc, n = _line_geometry(line, size)
+        base_scores[line] = _score_grid_line(grid, codes, active, r0, c0, dr, dc, n, player)
+        base_total = _add_line_score(base_total, base_scores[line])
+    terminal_lines = np.nonzero((base_scores >= _P_WIN) | (base_scores <= _O_WIN))[0]
+
+    n = rs.shape[0]
+    num_chunks = min(n, SWEEP_CHUNKS)
+    for chunk in prange(num_chunks):
+        # One scratch grid per chunk: each candidate is placed, evaluated and removed,
+        # so the board is copied once per thread instead of once per cell
+        scratch = np.copy(grid)
+        chunk_codes = np.empty(size, dtype=np.int8)
+        chunk_active = np.empty(num_patterns, dtype=np.bool_)
+        for i in range(chunk, n, num_chunks):
+            out[i] = _evaluate_move(scratch, rs[i], cs[i], player, base_scores, base_total, terminal_lines, chunk_codes, chunk_active)
+
+
+def warm_up_evaluation():
+    """Compiles the evaluation kernel at startup instead of on the first evaluation.
+
+    This also starts numba's parallel thread pool from the main thread: the
+    research-mode sweep later runs on a background thread, and a pool first
+    started there (TBB layer) can keep the interpreter from exiting.
+    """
+    # Same dtype as Board.grid so the compiled signature is reused
+    grid = np.zeros((5, 5), dtype=int)
+    _evaluate_moves(grid, np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64), BOARD_BLACK, np.empty(1, dtype=np.int64))
 
 
 # Factory function to create AI instance based on difficulty
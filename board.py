@@ -1,5 +1,5 @@
 import numpy as np
-from constants import DEFAULT_BOARD_SIZE, DEFAULT_WIN_LENGTH
+from constants import DEFAULT_BOARD_SIZE, DEFAULT_WIN_LENGTH, DEBUG
 
 # Player representation
 EMPTY = 0
@@ -65,7 +65,7 @@ class Board:
                 allowed_pos1 = (center_r - 1, center_c) # Directly above center
                 allowed_pos2 = (center_r - 1, center_c + 1) # Diagonally up-right from center
                 if (row, col) not in [allowed_pos1, allowed_pos2]:
-                    print(f"DEBUG [Board]: Invalid - Move 1 must be {allowed_pos1} or {allowed_pos2}. Got ({row},{col})") # DEBUG
+                    if DEBUG: print(f"DEBUG [Board]: Invalid - Move 1 must be {allowed_pos1} or {allowed_pos2}. Got ({row},{col})") # DEBUG
                     return False
             elif move_count == 2:  # Black's 2nd move (3rd overall)
                 # print("DEBUG [Board]: Checking Move 2 (Black 2nd)") # DEBUG
@@ -56,4 +56,7 @@ POPUP_COLOR_ATTACK = WHITE
 
 # Stone Placing Animation Constants
 PLACING_ANIMATION_DURATION = 300 # ms
-PLACING_ANIMATION_START_SCALE = 2.0 
\ No newline at end of file
+PLACING_ANIMATION_START_SCALE = 2.0 
+
+# Debug output (per-move/per-cell trace prints); off in shipped builds
+DEBUG = False
@@ -9,18 +9,22 @@ from constants import (
     ANIMATION_DURATION, BLINK_INTERVAL, BLINK_COUNT,
     BLINK_RADIUS_FACTOR, BLINK_COLOR_APPEAR, BLINK_COLOR_DISAPPEAR,
     POPUP_COLOR_DEFENSE, POPUP_COLOR_PURSUIT, POPUP_COLOR_ATTACK, # Added popup colors
-    PLACING_ANIMATION_DURATION, PLACING_ANIMATION_START_SCALE # Added PLACING_ANIMATION_DURATION and PLACING_ANIMATION_START_SCALE constants
+    PLACING_ANIMATION_DURATION, PLACING_ANIMATION_START_SCALE, DEBUG # Added PLACING_ANIMATION_DURATION and PLACING_ANIMATION_START_SCALE constants
 )
 from board import (
     DIRECTIONS, Board, BLACK as BOARD_BLACK, WHITE as BOARD_WHITE, EMPTY,
     THREAT_OPEN_THREE, THREAT_CLOSED_FOUR, THREAT_OPEN_FOUR # 追加
 )
-from ui import Button, Checkbox, Telop, TextPopup # Added TextPopup import
-from ai import create_ai, AIHard
+from ui import Button, Checkbox, Telop, TextPopup, draw_buttons, get_font # Added TextPopup import
+from ai import create_ai, _evaluate_moves, ZOBRIST_PLAYERS, NUM_ZOBRIST_PLAYERS
 # Import Joseki related components (Remove JosekiPopup)
-from joseki import load_joseki, check_joseki # Removed JosekiPopup import
-from collections import defaultdict # Add defaultdict import
+from joseki import load_joseki, JosekiMatcher # Removed JosekiPopup import
+from itertools import chain
 import math # For evaluation infinity
+import numpy as np # For board-to-screen coordinate lookup tables
+from collections import OrderedDict # LRU memo of research-mode evaluations
+import queue # Research-mode results handed from the evaluation thread to the main loop
+import threading
 
 # 色の定数を追加
 BLUE = (0, 0, 255)
@@ -30,38 +34,63 @@ RED = (255, 0, 0)
 THREAT_LINE_WIDTH = 2 # Thinner lines for threats
 WIN_LINE_WIDTH = 5    # Thicker line for win
 
+# Threat direction -> bit in the per-cell direction mask used to find intersections
+THREAT_DIRECTION_BITS = {'h': 1, 'v': 2, 'd1': 4, 'd2': 8}
+DIRECTION_BIT_COUNTS = np.array([bin(i).count('1') for i in range(16)], dtype=np.uint8)
+
+# Max number of (position hash, player) -> score entries kept for research mode
+EVALUATION_LRU_MAX_ENTRIES = 200000
+EVALUATION_BATCH_SIZE = 64 # Cells per background result batch, so scores appear while the sweep runs
+
 class Game:
     """Handles the game screen logic, drawing, and player/AI interaction."""
     def __init__(self, screen, settings):
         self.screen = screen
         self.settings = settings
-        self.font = pygame.font.Font(None, 30)
-        self.small_font = pygame.font.Font(None, 24) # Font for move counter
-        self.game_over_font = pygame.font.Font(None, 72)
+        self.font = get_font(30)
+        self.small_font = get_font(24) # Font for move counter
+        self.game_over_font = get_font(72)
         # --- Use a Japanese Font --- #
         # !!! Replace with the actual path to your Japanese font file !!!
         japanese_font_path = "./fonts/YasashisaGothicBold-V2.otf"
         try:
-            self.telop_font = pygame.font.Font(japanese_font_path, 48)
+            self.telop_font = get_font(48, japanese_font_path)
         except pygame.error as e:
             print(f"Error loading Japanese font '{japanese_font_path}': {e}")
             print("Falling back to default font for telop.")
-            self.telop_font = pygame.font.Font(None, 48) # Fallback
-        self.evaluation_font = pygame.font.Font(None, 16) # Font for evaluation scores
+            self.telop_font = get_font(48) # Fallback
+        self.evaluation_font = get_font(16) # Font for evaluation scores
 
         # Initialize Telop instance
         self.telop = Telop(screen_width=SCREEN_WIDTH, # Pass screen width
                            center_pos=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2),
                            font=self.telop_font)
 
+        # Game over overlay (allocated and filled once, reused every frame while the game is over)
+        self._gameover_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self._gameover_overlay.fill(GAMEOVER_OVERLAY_COLOR)
+
+        # Static layer: board, stones, scores, threat lines and status, re-rendered only when
+        # the game state changes. Each frame blits it back under last frame's overlays only.
+        self._static_layer = pygame.Surface(screen.get_size()).convert()
+        self.static_layer_dirty = True
+        self._overlay_rects = [] # Screen areas covered by overlays in the last drawn frame
+        self._transient_overlays_drawn = False # Last frame showed an animation, popup or telop
+
+        # Research-mode evaluation runs on a background thread; finished batches are queued
+        # and moved into the caches by update(). Results from older generations are dropped.
+        self.evaluation_results = queue.Queue() # (generation, cells, keys, scores or None on error)
+        self.evaluation_generation = 0
+        self._evaluation_lock = threading.Lock() # One sweep at a time (numba's parallel pool is not re-entrant)
+
         # Initialize Animation state
         self.animating_stones = [] # List of [(r, c, color), ...]
         self.animation_start_time = 0
         self.animation_blink_count = 0 # Remaining blinks
         self.show_blink = False # Whether to show blink circle in current frame
 
-        # Initialize Text Popup manager
-        self.text_popups = []
+        # Initialize Text Popup manager (sprite group: batched draw, expired popups kill themselves)
+        self.text_popups = pygame.sprite.Group()
         # Initialize consecutive pursuit count for each player
         self.consecutive_pursuit_count = {BOARD_BLACK: 0, BOARD_WHITE: 0}
 
@@ -118,6 +147,7 @@ class Game:
             self.current_player = BOARD_WHITE
 
         self.player_types = self.settings.get_player_types()
+        self.animations_enabled = self.settings.animations_enabled
         self.ai_instances = {BOARD_BLACK: None, BOARD_WHITE: None}
         if self.player_types[0] == PLAYER_AI:
             self.ai_instances[BOARD_BLACK] = create_ai(
@@ -129,9 +159,13 @@ class Game:
             )
 
         self.needs_redraw = True
+        self.static_layer_dirty = True
         self.ai_thinking = False
         # self.move_history = [] # Already initialized or loaded above
-        self.joseki_patterns = load_joseki()
+        self.joseki_patterns = load_joseki(board_size=self.board.size)
+        self.joseki_matcher = JosekiMatcher(self.joseki_patterns)
+        for move in self.move_history: # Catch up with a loaded history
+            self.joseki_matcher.push(move)
         # self.joseki_popup = JosekiPopup() # Removed JosekiPopup instance
         self.invalid_move_pos = None
         self.invalid_move_timer = 0
@@ -147,7 +181,12 @@ class Game:
         # --- Research Mode State ---
         self.research_mode_enabled = False
         self.evaluation_cache = {} # Cache for { (r, c): score }
-        self.evaluation_in_progress = False # Flag to prevent concurrent evaluation
+        self.evaluation_in_progress = False # A background sweep is still delivering scores
+        self.evaluation_generation += 1 # Drop results of a sweep started before the reset
+        # Zobrist hashing of positions, so evaluations are reused across moves/history navigation
+        self.zobrist_table = np.random.randint(1, 2**63 - 1, size=(self.board.size, self.board.size, NUM_ZOBRIST_PLAYERS), dtype=np.uint64)
+        self.position_hash = self._hash_board(self.board) # Kept in sync incrementally in _make_move
+        self.evaluation_lru = OrderedDict() # { (position_hash, player_to_eval): score }, oldest first
 
         # --- Dynamic calculation of board position and size --- #
         # Define Y positions for top elements
@@ -176,6 +215,12 @@ class Game:
              self.start_y = min_top_margin_for_board + (allowed_board_area_height - self.board_pixel_size) // 2
         # Else (if board pixel size >= allowed height), start_y remains min_top_margin_for_board
 
+        # Board index -> screen pixel lookup tables (rebuilt whenever the layout is recalculated).
+        # Kept as Python int lists: they are only indexed one cell at a time, where numpy scalars are slower.
+        board_indices = np.arange(self.board.size, dtype=np.int32)
+        self._col_px = (self.start_x + board_indices * self.cell_size).tolist()
+        self._row_px = (self.start_y + board_indices * self.cell_size).tolist()
+
         # --- UI Buttons and Controls (Positions relative to screen/board) ---
         # Top Bar Buttons
         self.back_button = Button("Menu", (SCREEN_WIDTH - 80, top_button_y), self.font)
@@ -205,7 +250,7 @@ class Game:
         pygame.display.flip() # Update screen
         # --- End Force draw --- #
 
-        print("Game Reset" + (" with loaded history" if move_history_to_load else "")) # Debug
+        if DEBUG: print("Game Reset" + (" with loaded history" if move_history_to_load else "")) # Debug
         if self.current_player == BOARD_WHITE and self.player_types[1] == PLAYER_AI:
              print("AI (White) starts.")
         elif self.current_player == BOARD_BLACK and self.player_types[0] == PLAYER_AI:
@@ -219,7 +264,7 @@ class Game:
         self.animation_blink_count = 0
         self.show_blink = False
         # Clear popups on reset
-        self.text_popups = []
+        self.text_popups.empty()
         # Reset consecutive pursuit count
         self.consecutive_pursuit_count = {BOARD_BLACK: 0, BOARD_WHITE: 0}
 
@@ -281,7 +326,7 @@ class Game:
              # Use the live game's win line (set in _make_move)
              return self.win_line
 
-    def _draw_board(self):
+    def _draw_board(self, surface):
         """Draws the Gomoku board lines and star points (uses current display board size and calculated cell_size)."""
         board_to_draw = self._get_current_board_for_display()
         board_pixel_size = (board_to_draw.size - 1) * self.cell_size # Use instance cell_size
@@ -289,13 +334,13 @@ class Game:
         end_x = self.start_x + board_pixel_size
         end_y = self.start_y + board_pixel_size
 
-        self.screen.fill(BOARD_COLOR)
+        surface.fill(BOARD_COLOR)
         for i in range(board_to_draw.size):
             # Use self.cell_size for drawing
-            x = self.start_x + i * self.cell_size
-            pygame.draw.line(self.screen, LINE_COLOR, (x, self.start_y), (x, end_y))
-            y = self.start_y + i * self.cell_size
-            pygame.draw.line(self.screen, LINE_COLOR, (self.start_x, y), (end_x, y))
+            x = self._col_px[i]
+            pygame.draw.line(surface, LINE_COLOR, (x, self.start_y), (x, end_y))
+            y = self._row_px[i]
+            pygame.draw.line(surface, LINE_COLOR, (self.start_x, y), (end_x, y))
         # Draw star points based on the board being drawn and cell_size
         if board_to_draw.size >= 9: # Adjust star point logic for different sizes
             radius = self.cell_size // 6
@@ -314,14 +359,15 @@ class Game:
                  points.append((board_to_draw.size - 1 - offset, board_to_draw.size - 1 - offset))
 
             for r_idx, c_idx in points:
-                center_x = self.start_x + c_idx * self.cell_size
-                center_y = self.start_y + r_idx * self.cell_size
+                center_x = self._col_px[c_idx]
+                center_y = self._row_px[r_idx]
                 pygame.draw.circle(
-                    self.screen, LINE_COLOR, (center_x, center_y), max(1, radius) # Ensure radius >= 1
+                    surface, LINE_COLOR, (center_x, center_y), max(1, radius) # Ensure radius >= 1
                 )
 
-    def _draw_stones_and_markers(self):
-        """Draws stones, markers, AND evaluation scores (uses current display board and cell_size)."""
+    def _draw_stones_and_markers(self, surface):
+        """Draws stones, markers, AND evaluation scores (uses current display board and cell_size).
+           The stone being placed (animated) is left out and drawn by _draw_animations."""
         board_to_draw = self._get_current_board_for_display()
         stone_radius = self.cell_size // 2 - 2
         last_move_marker_radius = stone_radius // 3
@@ -340,79 +386,42 @@ class Game:
                     if board_to_draw.grid[r, c] == EMPTY:
                         # Check validity for the *live* current player
                         if not self.board.is_valid_move(r, c, self.current_player, move_count):
-                            center_x = self.start_x + c * self.cell_size
-                            center_y = self.start_y + r * self.cell_size
+                            center_x = self._col_px[c]
+                            center_y = self._row_px[r]
                             # Don't draw invalid marker if the placing animation is happening there
                             if not (self.placing_stone_animation and self.placing_animated_stone_info[:2] == (r, c)):
                                 rect = invalid_surface.get_rect(center=(center_x, center_y))
-                                self.screen.blit(invalid_surface, rect)
+                                surface.blit(invalid_surface, rect)
 
         # Draw stones (use self.cell_size)
         for r in range(board_to_draw.size):
             for c in range(board_to_draw.size):
                 player = board_to_draw.grid[r, c]
 
-                # Check if this is the stone being animated for placing
-                is_placing_animated = False
+                # The stone being animated for placing is drawn on top by _draw_animations
                 if self.placing_stone_animation and self.placing_animated_stone_info:
                     anim_r, anim_c, anim_player = self.placing_animated_stone_info
                     if r == anim_r and c == anim_c:
-                        is_placing_animated = True
-                        player = anim_player # Use the player from animation info
+                        continue
 
-                if player != EMPTY: # Draw if stone exists or is being placed
-                    center_x = self.start_x + c * self.cell_size
-                    center_y = self.start_y + r * self.cell_size
+                if player != EMPTY: # Draw if stone exists
+                    center_x = self._col_px[c]
+                    center_y = self._row_px[r]
                     color = BLACK if player == BOARD_BLACK else WHITE
-
-                    if is_placing_animated:
-                        # Calculate animation progress and properties
-                        now = pygame.time.get_ticks()
-                        elapsed = now - self.placing_animation_start_time
-                        progress = min(1.0, elapsed / PLACING_ANIMATION_DURATION)
-
-                        # Scale from START_SCALE down to 1.0
-                        current_scale = PLACING_ANIMATION_START_SCALE + (1.0 - PLACING_ANIMATION_START_SCALE) * progress
-                        # Alpha from 0 to 255
-                        current_alpha = 255 * progress
-
-                        # Calculate size and create surface
-                        current_radius = int(stone_radius * current_scale)
-                        if current_radius < 1: current_radius = 1 # Ensure radius is at least 1
-                        stone_size = current_radius * 2
-                        temp_surface = pygame.Surface((stone_size, stone_size), pygame.SRCALPHA)
-                        pygame.draw.circle(temp_surface, color, (current_radius, current_radius), current_radius)
-                        temp_surface.set_alpha(int(current_alpha))
-
-                        # Blit the scaled and faded surface
-                        blit_rect = temp_surface.get_rect(center=(center_x, center_y))
-                        self.screen.blit(temp_surface, blit_rect)
-
-                    else:
-                        # Draw normal stone if not animating
-                        pygame.draw.circle(
-                            self.screen, color, (center_x, center_y), max(1, stone_radius)
-                        )
+                    pygame.draw.circle(
+                        surface, color, (center_x, center_y), max(1, stone_radius)
+                    )
 
                     # Draw marker on the last placed stone *for the currently displayed history index*
-                    # Don't draw last move marker if this stone is being animated
-                    if not is_placing_animated and board_to_draw.last_move == (r, c):
+                    if board_to_draw.last_move == (r, c):
                         marker_color = GRAY
                         pygame.draw.circle(
-                            self.screen, marker_color, (center_x, center_y),
+                            surface, marker_color, (center_x, center_y),
                             max(1, last_move_marker_radius) # Ensure radius >= 1
                          )
 
-        # Draw feedback for the specific invalid click (only in live mode)
-        if not self.is_history_mode and self.invalid_move_pos:
-            r_inv, c_inv = self.invalid_move_pos
-            center_x = self.start_x + c_inv * self.cell_size
-            center_y = self.start_y + r_inv * self.cell_size
-            radius = self.cell_size // 2
-            pygame.draw.circle(self.screen, RED, (center_x, center_y), radius, 2)
-
         # Draw evaluation scores if research mode is enabled (use self.cell_size)
-        if self.research_mode_enabled and not self.evaluation_in_progress:
+        if self.research_mode_enabled: # Cells still being evaluated have no score yet
             for r in range(board_to_draw.size):
                 for c in range(board_to_draw.size):
                     if board_to_draw.grid[r, c] == EMPTY:
@@ -433,28 +442,70 @@ class Game:
                             elif score < -eval_threshold: color = (200, 0, 0) # Red
 
                             score_surf = self.evaluation_font.render(score_str, True, color)
-                            center_x = self.start_x + c * self.cell_size
-                            center_y = self.start_y + r * self.cell_size
+                            center_x = self._col_px[c]
+                            center_y = self._row_px[r]
                             score_rect = score_surf.get_rect(center=(center_x, center_y))
                             # Optional: Add background for readability
-                            # pygame.draw.rect(self.screen, BOARD_COLOR, score_rect.inflate(2,2))
-                            self.screen.blit(score_surf, score_rect)
+                            # pygame.draw.rect(surface, BOARD_COLOR, score_rect.inflate(2,2))
+                            surface.blit(score_surf, score_rect)
                         elif score == "Err":
                              # Draw error indicator (e.g., a small red X)
-                             center_x = self.start_x + c * self.cell_size
-                             center_y = self.start_y + r * self.cell_size
+                             center_x = self._col_px[c]
+                             center_y = self._row_px[r]
                              err_surf = self.evaluation_font.render("X", True, RED)
                              err_rect = err_surf.get_rect(center=(center_x, center_y))
-                             self.screen.blit(err_surf, err_rect)
+                             surface.blit(err_surf, err_rect)
                         # else: score is None (invalid move), draw nothing
 
+    def _draw_animations(self):
+        """Draws the placing stone, invalid click feedback and blinking threat stones on the screen.
+           Returns the list of screen rects drawn."""
+        rects = []
+        stone_radius = self.cell_size // 2 - 2
+
+        # --- Draw Placing Animation --- #
+        if self.placing_stone_animation and self.placing_animated_stone_info:
+            anim_r, anim_c, anim_player = self.placing_animated_stone_info
+            center_x = self._col_px[anim_c]
+            center_y = self._row_px[anim_r]
+            color = BLACK if anim_player == BOARD_BLACK else WHITE
+            # Calculate animation progress and properties
+            now = pygame.time.get_ticks()
+            elapsed = now - self.placing_animation_start_time
+            progress = min(1.0, elapsed / PLACING_ANIMATION_DURATION)
+
+            # Scale from START_SCALE down to 1.0
+            current_scale = PLACING_ANIMATION_START_SCALE + (1.0 - PLACING_ANIMATION_START_SCALE) * progress
+            # Alpha from 0 to 255
+            current_alpha = 255 * progress
+
+            # Calculate size and create surface
+            current_radius = int(stone_radius * current_scale)
+            if current_radius < 1: current_radius = 1 # Ensure radius is at least 1
+            stone_size = current_radius * 2
+            temp_surface = pygame.Surface((stone_size, stone_size), pygame.SRCALPHA)
+            pygame.draw.circle(temp_surface, color, (current_radius, current_radius), current_radius)
+            temp_surface.set_alpha(int(current_alpha))
+
+            # Blit the scaled and faded surface
+            blit_rect = temp_surface.get_rect(center=(center_x, center_y))
+            rects.append(self.screen.blit(temp_surface, blit_rect))
+
+        # Draw feedback for the specific invalid click (only in live mode)
+        if not self.is_history_mode and self.invalid_move_pos:
+            r_inv, c_inv = self.invalid_move_pos
+            center_x = self._col_px[c_inv]
+            center_y = self._row_px[r_inv]
+            radius = self.cell_size // 2
+            rects.append(pygame.draw.circle(self.screen, RED, (center_x, center_y), radius, 2))
+
         # --- Draw Blinking Animation --- #
         if self.animation_blink_count > 0 and self.show_blink:
             stone_radius = self.cell_size // 2 - 2 # Use stone radius
             blink_line_width = 2 # Line thickness for the circle
             for r_anim, c_anim, blink_color in self.animating_stones:
-                 center_x = self.start_x + c_anim * self.cell_size
-                 center_y = self.start_y + r_anim * self.cell_size
+                 center_x = self._col_px[c_anim]
+                 center_y = self._row_px[r_anim]
                  # Create a surface large enough for the stone radius outline
                  surface_size = stone_radius * 2
                  blink_surface = pygame.Surface((surface_size, surface_size), pygame.SRCALPHA)
@@ -464,7 +515,8 @@ class Game:
                  # Blit the surface centered on the stone
                  blit_pos_x = center_x - stone_radius
                  blit_pos_y = center_y - stone_radius
-                 self.screen.blit(blink_surface, (blit_pos_x, blit_pos_y))
+                 rects.append(self.screen.blit(blink_surface, (blit_pos_x, blit_pos_y)))
+        return rects
 
     def _get_board_pos_from_mouse(self, mouse_pos):
         """Converts mouse coordinates to board row and column indices (uses self.cell_size)."""
@@ -552,6 +604,7 @@ class Game:
                     self.is_history_mode = True # Enter history mode
                     self.history_board_cache = None # Invalidate cache
                     self.needs_redraw = True
+                    self.static_layer_dirty = True
                     print(f"History: Moved to index {self.display_move_index}")
                 return None # Consume event
 
@@ -560,6 +613,7 @@ class Game:
                     self.display_move_index += 1
                     self.history_board_cache = None # Invalidate cache
                     self.needs_redraw = True
+                    self.static_layer_dirty = True
                     print(f"History: Moved to index {self.display_move_index}")
                     # If we reached the current actual game state, exit history mode
                     if self.display_move_index == len(self.move_history):
@@ -582,7 +636,10 @@ class Game:
                      self._evaluate_empty_cells() # Trigger evaluation immediately
                  else:
                       self.evaluation_cache.clear()
+                      self.evaluation_generation += 1 # Drop results of a sweep still running
+                      self.evaluation_in_progress = False
                  self.needs_redraw = True
+                 self.static_layer_dirty = True
                  return None # Consume event
 
         # Handle Gameplay Input
@@ -598,9 +655,10 @@ class Game:
                          move_made = self._make_move(row, col)
                          if move_made:
                              # --- Force redraw immediately after human move --- #
-                             # print("DEBUG: Human move made, forcing immediate redraw...") # Comment out
-                             self.draw() # Draw the updated board state
-                             pygame.display.flip() # Update the actual screen
+                             # Skipped when the AI moves next (its "thinking" telop forces its own redraw) and in fast mode
+                             if self.animations_enabled and self.ai_instances[self.current_player] is None:
+                                 self.draw() # Draw the updated board state
+                                 pygame.display.flip() # Update the actual screen
                              # --- End Force redraw --- #
                              if self.research_mode_enabled:
                                   # Re-evaluate AFTER the move is made and player switched
@@ -618,7 +676,7 @@ class Game:
 
         # Process added threats first (Blue)
         if added_threats:
-            print(f"DEBUG: Processing APPEAR animation for {len(added_threats)} threats") # Debug
+            if DEBUG: print(f"DEBUG: Processing APPEAR animation for {len(added_threats)} threats") # Debug
             for threat_info in added_threats:
                 if len(threat_info) >= 5:
                     current_stones = set(threat_info[4]) # Get stone coords for this threat
@@ -632,7 +690,7 @@ class Game:
         # Process removed threats (Red), avoiding overlap with blue
         removed_stone_coords = set()
         if removed_threats:
-            print(f"DEBUG: Processing DISAPPEAR animation for {len(removed_threats)} threats") # Debug
+            if DEBUG: print(f"DEBUG: Processing DISAPPEAR animation for {len(removed_threats)} threats") # Debug
             for threat_info in removed_threats:
                 if len(threat_info) >= 5:
                     removed_stone_coords.update(threat_info[4])
@@ -653,29 +711,31 @@ class Game:
             animation_triggered = True
 
         if animation_triggered:
-             print(f"DEBUG: Animation started. Total blinking stones: {len(self.animating_stones)}")
+             if DEBUG: print(f"DEBUG: Animation started. Total blinking stones: {len(self.animating_stones)}")
 
     def _make_move(self, row, col):
          """Attempts to make a move, checks win/threats/joseki, switches player, starts animation."""
          current_player = self.current_player
          opponent_player = BOARD_WHITE if current_player == BOARD_BLACK else BOARD_BLACK
-         # Get threats *before* the move
-         threats_before_list = self.board.find_threats(current_player) + self.board.find_threats(opponent_player)
+         # Get threats *before* the move (only needed for animations/popups)
+         if self.animations_enabled:
+             threats_before_list = self.board.find_threats(current_player) + self.board.find_threats(opponent_player)
 
          move_count = len(self.move_history)
          if self.board.place_stone(row, col, current_player, move_count):
             self.needs_redraw = True
+            self.static_layer_dirty = True
             self.move_history.append((row, col))
+            self.position_hash ^= self.zobrist_table[row, col, ZOBRIST_PLAYERS[current_player]]
             self.invalid_move_pos = None # Clear invalid click feedback
             self.win_line = None
 
-            # Check Joseki
-            matched_joseki = check_joseki(
-                self.move_history, self.joseki_patterns, self.board.size
-            )
+            # Check Joseki (incremental: one step per move)
+            matched = self.joseki_matcher.push((row, col))
+            matched_joseki = matched['name'] if matched else None
             if matched_joseki:
                 # Display Joseki name via Telop for 1 second
-                print(f"DEBUG: Joseki matched: {matched_joseki}. Showing telop.") # Debug
+                if DEBUG: print(f"DEBUG: Joseki matched: {matched_joseki}. Showing telop.") # Debug
                 self.telop.show(matched_joseki, 1000) # Show for 1000ms
                 # Also show the original popup (optional, can be removed)
                 # self.joseki_popup.show(matched_joseki) # Removed JosekiPopup show call
@@ -697,86 +757,88 @@ class Game:
                 else:
                     self._switch_player()
 
-            # Get threats *after* the move
-            threats_after_list = self.board.find_threats(current_player) + self.board.find_threats(opponent_player)
-
-            # Compare threat sets based on frozenset of stone coordinates
-            def get_threat_id(threat_info):
-                # Ensure threat_info has the 5th element (player_stone_coords)
-                if len(threat_info) >= 5 and isinstance(threat_info[4], list):
-                    return frozenset(threat_info[4])
-                return None # Return None if format is unexpected
-
-            threat_ids_before = {get_threat_id(t) for t in threats_before_list if get_threat_id(t)}
-            threat_ids_after = {get_threat_id(t) for t in threats_after_list if get_threat_id(t)}
-
-            added_threat_ids = threat_ids_after - threat_ids_before
-            removed_threat_ids = threat_ids_before - threat_ids_after
-
-            # Get the full threat info tuples corresponding to the added/removed IDs
-            added_threats_info = [t for t in threats_after_list if get_threat_id(t) in added_threat_ids]
-            removed_threats_info = [t for t in threats_before_list if get_threat_id(t) in removed_threat_ids]
-
-            # --- Start Placing Animation --- #
-            self.placing_stone_animation = True
-            self.placing_animation_start_time = pygame.time.get_ticks()
-            self.placing_animated_stone_info = (row, col, current_player)
-            print(f"DEBUG: Started placing animation for ({row},{col}), player {current_player}")
-
-            # --- Determine and add Text Popups --- #
-            popups_to_add = []
-            # Get the player who just moved BEFORE switching
-            player_who_moved = current_player
-
-            move_pos = (row, col)
-            popup_base_center_x = self.start_x + col * self.cell_size
-            popup_base_center_y = self.start_y + row * self.cell_size
-            popup_base_pos = (popup_base_center_x, popup_base_center_y)
-
-            pursuit_added = False
-            defense_added = False
-
-            if added_threats_info:
-                # Increment pursuit count for the player who moved
-                self.consecutive_pursuit_count[player_who_moved] += 1
-                count = self.consecutive_pursuit_count[player_who_moved]
-                popup_text = "追い手" if count == 1 else f"追い手×{count}"
-                popups_to_add.append({"text": popup_text, "color": POPUP_COLOR_PURSUIT})
-                pursuit_added = True # Set flag to skip other checks
-                print(f"DEBUG Popups: '{popup_text}' triggered at {move_pos} for player {player_who_moved} (Count: {count})")
-            else:
-                # Reset pursuit count for the player who moved if they didn't make a pursuit move
-                self.consecutive_pursuit_count[player_who_moved] = 0
-
-                # Check for defense and attack only if no pursuit was added
-                if removed_threats_info:
-                    popups_to_add.append({"text": "防手", "color": POPUP_COLOR_DEFENSE})
-                    defense_added = True
-                    print(f"DEBUG Popups: '防手' triggered at {move_pos}")
-
-                # Check for "攻手"
-                if self._check_if_move_created_three(self.board, row, col, player_who_moved):
-                    # Add attack popup (stacking will handle if defense also added)
-                    popups_to_add.append({"text": "攻手", "color": POPUP_COLOR_ATTACK})
-                    print(f"DEBUG Popups: '攻手' triggered at {move_pos}")
-
-            # --- Add and stack popups --- #
-            num_popups = len(popups_to_add)
-            base_offset_y = -30 # Default vertical offset
-            vertical_spacing = -25 # Space between stacked popups (negative means going up)
-            for i, popup_data in enumerate(popups_to_add):
-                # Calculate vertical offset for stacking
-                # Center the stack around the base offset
-                stack_offset = base_offset_y + (i - (num_popups - 1) / 2) * vertical_spacing
-                # Create the popup with adjusted position (using a TextPopup specific offset)
-                # Use self.telop_font as requested
-                popup = TextPopup(popup_data["text"], popup_base_pos, self.telop_font, 1000, popup_data["color"], offset_y=int(stack_offset))
-                popup.show()
-                self.text_popups.append(popup)
-
-            # Start blinking animation AFTER popups are potentially added
-            if added_threats_info or removed_threats_info:
-                self._start_threat_animation(added_threats_info, removed_threats_info)
+            # Threat comparison, popups and animations are skipped entirely in fast mode
+            if self.animations_enabled:
+                # Get threats *after* the move
+                threats_after_list = self.board.find_threats(current_player) + self.board.find_threats(opponent_player)
+
+                # Compare threat sets based on frozenset of stone coordinates
+                def get_threat_id(threat_info):
+                    # Ensure threat_info has the 5th element (player_stone_coords)
+                    if len(threat_info) >= 5 and isinstance(threat_info[4], list):
+                        return frozenset(threat_info[4])
+                    return None # Return None if format is unexpected
+
+                threat_ids_before = {get_threat_id(t) for t in threats_before_list if get_threat_id(t)}
+                threat_ids_after = {get_threat_id(t) for t in threats_after_list if get_threat_id(t)}
+
+                added_threat_ids = threat_ids_after - threat_ids_before
+                removed_threat_ids = threat_ids_before - threat_ids_after
+
+                # Get the full threat info tuples corresponding to the added/removed IDs
+                added_threats_info = [t for t in threats_after_list if get_threat_id(t) in added_threat_ids]
+                removed_threats_info = [t for t in threats_before_list if get_threat_id(t) in removed_threat_ids]
+
+                # --- Start Placing Animation --- #
+                self.placing_stone_animation = True
+                self.placing_animation_start_time = pygame.time.get_ticks()
+                self.placing_animated_stone_info = (row, col, current_player)
+                if DEBUG: print(f"DEBUG: Started placing animation for ({row},{col}), player {current_player}")
+
+                # --- Determine and add Text Popups --- #
+                popups_to_add = []
+                # Get the player who just moved BEFORE switching
+                player_who_moved = current_player
+
+                move_pos = (row, col)
+                popup_base_center_x = self._col_px[col]
+                popup_base_center_y = self._row_px[row]
+                popup_base_pos = (popup_base_center_x, popup_base_center_y)
+
+                pursuit_added = False
+                defense_added = False
+
+                if added_threats_info:
+                    # Increment pursuit count for the player who moved
+                    self.consecutive_pursuit_count[player_who_moved] += 1
+                    count = self.consecutive_pursuit_count[player_who_moved]
+                    popup_text = "追い手" if count == 1 else f"追い手×{count}"
+                    popups_to_add.append({"text": popup_text, "color": POPUP_COLOR_PURSUIT})
+                    pursuit_added = True # Set flag to skip other checks
+                    if DEBUG: print(f"DEBUG Popups: '{popup_text}' triggered at {move_pos} for player {player_who_moved} (Count: {count})")
+                else:
+                    # Reset pursuit count for the player who moved if they didn't make a pursuit move
+                    self.consecutive_pursuit_count[player_who_moved] = 0
+
+                    # Check for defense and attack only if no pursuit was added
+                    if removed_threats_info:
+                        popups_to_add.append({"text": "防手", "color": POPUP_COLOR_DEFENSE})
+                        defense_added = True
+                        if DEBUG: print(f"DEBUG Popups: '防手' triggered at {move_pos}")
+
+                    # Check for "攻手"
+                    if self._check_if_move_created_three(self.board, row, col, player_who_moved):
+                        # Add attack popup (stacking will handle if defense also added)
+                        popups_to_add.append({"text": "攻手", "color": POPUP_COLOR_ATTACK})
+                        if DEBUG: print(f"DEBUG Popups: '攻手' triggered at {move_pos}")
+
+                # --- Add and stack popups --- #
+                num_popups = len(popups_to_add)
+                base_offset_y = -30 # Default vertical offset
+                vertical_spacing = -25 # Space between stacked popups (negative means going up)
+                for i, popup_data in enumerate(popups_to_add):
+                    # Calculate vertical offset for stacking
+                    # Center the stack around the base offset
+                    stack_offset = base_offset_y + (i - (num_popups - 1) / 2) * vertical_spacing
+                    # Create the popup with adjusted position (using a TextPopup specific offset)
+                    # Use self.telop_font as requested
+                    popup = TextPopup(popup_data["text"], popup_base_pos, self.telop_font, 1000, popup_data["color"], offset_y=int(stack_offset))
+                    popup.show()
+                    self.text_popups.add(popup)
+
+                # Start blinking animation AFTER popups are potentially added
+                if added_threats_info or removed_threats_info:
+                    self._start_threat_animation(added_threats_info, removed_threats_info)
 
             return True # Indicate move was successful
          else:
@@ -817,43 +879,43 @@ class Game:
     def update(self):
         """Handles AI moves, UI element updates, and animations."""
         # self.joseki_popup.update() # Removed JosekiPopup update
+        now = pygame.time.get_ticks() # One clock read shared by every timer below
+
+        # Collect research-mode scores delivered by the evaluation thread
+        if self.evaluation_in_progress:
+            self._collect_evaluation_results()
 
         # Update invalid move feedback timer
         if self.invalid_move_pos:
-            if pygame.time.get_ticks() - self.invalid_move_timer > self.invalid_move_duration:
+            if now - self.invalid_move_timer > self.invalid_move_duration:
                 self.invalid_move_pos = None
                 self.needs_redraw = True
 
         # Call Telop update here, after potential state changes
-        telop_is_active = self.telop.update()
+        telop_is_active = self.telop.update(now)
         # Force redraw if telop is animating/visible
         if telop_is_active:
             self.needs_redraw = True
 
         # Update Text Popups FIRST (so they animate even during blinking)
-        # Iterate backwards to allow removal during iteration
-        popup_updated = False
-        for i in range(len(self.text_popups) - 1, -1, -1):
-            popup = self.text_popups[i]
-            if popup.update(): # update returns True if still active
-                 popup_updated = True
-            else: # update returned False, popup duration passed
-                self.text_popups.pop(i)
-        # If any popup was updated (is still active), force redraw
-        if popup_updated:
+        # Expired popups remove themselves from the group (sprite.kill)
+        self.text_popups.update(now)
+        # If any popup is still active, force redraw
+        if self.text_popups:
              self.needs_redraw = True
 
         # --- Update Placing Animation State --- #
         placing_anim_active = False
         if self.placing_stone_animation:
             placing_anim_active = True # Assume active until duration check
-            now = pygame.time.get_ticks()
             elapsed = now - self.placing_animation_start_time
             if elapsed >= PLACING_ANIMATION_DURATION:
                 self.placing_stone_animation = False
                 self.placing_animated_stone_info = None
                 placing_anim_active = False # Animation ended
-                print("DEBUG: Placing animation finished.")
+                self.needs_redraw = True
+                self.static_layer_dirty = True # The placed stone now belongs to the static layer
+                if DEBUG: print("DEBUG: Placing animation finished.")
             else:
                 self.needs_redraw = True # Keep redrawing during animation
         # --- End Placing Animation Update --- #
@@ -862,7 +924,6 @@ class Game:
         is_animating = False
         if self.animation_blink_count > 0:
             is_animating = True
-            now = pygame.time.get_ticks()
             elapsed = now - self.animation_start_time
             # Calculate current blink state index (0, 1, 2, 3 for 2 blinks)
             blink_state_index = elapsed // BLINK_INTERVAL
@@ -872,20 +933,13 @@ class Game:
                 self.animation_blink_count = 0
                 self.animating_stones = []
                 self.show_blink = False
-                print("DEBUG: Animation finished.") # Debug
+                if DEBUG: print("DEBUG: Animation finished.") # Debug
             else:
                 # Determine if blink should be shown (even indices: ON, odd indices: OFF)
                 self.show_blink = (blink_state_index % 2 == 0)
                 self.needs_redraw = True # Need to redraw during animation
         # --- End Blinking Animation Update --- #
 
-        # Update Text Popups
-        # Iterate backwards to allow removal during iteration
-        for i in range(len(self.text_popups) - 1, -1, -1):
-            popup = self.text_popups[i]
-            if not popup.update(): # update returns False if duration passed
-                self.text_popups.pop(i)
-
         # Don't update AI or switch turns if game is over, history mode, OR ANIMATING
         # (includes both blinking animation and placing animation)
         if self.game_over or self.is_history_mode or is_animating or placing_anim_active:
@@ -926,35 +980,21 @@ class Game:
                         self.game_over = True
                         self.winner = None
                         print("Game Over! It's a draw because AI cannot move.")
+                        self.needs_redraw = True
+                        self.static_layer_dirty = True
                         self.telop.hide() # Ensure telop is hidden on draw too
 
-    def _get_coords_on_line(self, start_pos, end_pos, direction):
-        """Helper function to get all (r, c) coordinates on a threat line."""
-        coords = []
+    def _get_coords_on_line(self, start_pos, end_pos):
+        """Helper function to get all coordinates on a threat line as (rows, cols) arrays."""
         start_r, start_c = start_pos
         end_r, end_c = end_pos
+        n = max(abs(end_r - start_r), abs(end_c - start_c)) + 1
+        step_r = 0 if end_r == start_r else (1 if end_r > start_r else -1)
+        step_c = 0 if end_c == start_c else (1 if end_c > start_c else -1)
+        steps = np.arange(n)
+        return start_r + steps * step_r, start_c + steps * step_c
 
-        if direction == 'h':
-            for c in range(min(start_c, end_c), max(start_c, end_c) + 1):
-                coords.append((start_r, c))
-        elif direction == 'v':
-            for r in range(min(start_r, end_r), max(start_r, end_r) + 1):
-                coords.append((r, start_c))
-        elif direction == 'd1': # Down-Right (or Up-Left)
-            r, c = min(start_r, end_r), min(start_c, end_c)
-            while r <= max(start_r, end_r) and c <= max(start_c, end_c):
-                coords.append((r, c))
-                r += 1
-                c += 1
-        elif direction == 'd2': # Up-Right (or Down-Left)
-            r, c = max(start_r, end_r), min(start_c, end_c) # Start from top-left based on row
-            while r >= min(start_r, end_r) and c <= max(start_c, end_c):
-                 coords.append((r, c))
-                 r -= 1
-                 c += 1
-        return coords
-
-    def _draw_threat_and_win_lines(self):
+    def _draw_threat_and_win_lines(self, surface):
         """Draws threat lines and the win line (uses self.cell_size)."""
         board_to_draw = self._get_current_board_for_display()
         current_win_line = self._get_current_win_line_for_display()
@@ -962,44 +1002,33 @@ class Game:
         # Calculate threats based on the board being displayed
         black_threats = board_to_draw.find_threats(BOARD_BLACK)
         white_threats = board_to_draw.find_threats(BOARD_WHITE)
-        all_threats = black_threats + white_threats
+        all_threats = tuple(chain(black_threats, white_threats))
 
         if not all_threats and not current_win_line:
             return
 
         # Use self.cell_size for coordinate calculations
         # --- Threat Drawing Logic --- #
-        # 1. Map threats to coordinates
-        threat_map = defaultdict(list)
+        # 1. Single pass: line coordinates of each threat + per-cell bitmask of threat directions
+        dir_mask = np.zeros((board_to_draw.size, board_to_draw.size), dtype=np.uint8)
+        threat_lines = []
         for threat_info in all_threats:
-            threat_type, start_pos, end_pos, direction, _ = threat_info
-            coords = self._get_coords_on_line(start_pos, end_pos, direction)
-            for r, c in coords:
-                 threat_map[(r, c)].append((threat_type, direction))
-        # 2. Identify intersection points
-        intersection_points = set()
-        for pos, threats_at_pos in threat_map.items():
-            if len(threats_at_pos) >= 2:
-                directions = set(d for t, d in threats_at_pos)
-                has_horizontal = any(d == 'h' for d in directions)
-                has_vertical = any(d == 'v' for d in directions)
-                has_diagonal1 = any(d == 'd1' for d in directions)
-                has_diagonal2 = any(d == 'd2' for d in directions)
-                direction_categories = sum([has_horizontal, has_vertical, has_diagonal1, has_diagonal2])
-                if direction_categories >= 2:
-                    intersection_points.add(pos)
+            rr, cc = self._get_coords_on_line(threat_info[1], threat_info[2])
+            dir_mask[rr, cc] |= THREAT_DIRECTION_BITS[threat_info[3]]
+            threat_lines.append((threat_info, rr, cc))
+        # 2. Intersection points: cells crossed by threats in at least 2 different directions
+        is_intersection = DIRECTION_BIT_COUNTS[dir_mask] >= 2
         # 3. Draw threat lines
-        for threat_info in all_threats:
+        for threat_info, rr, cc in threat_lines:
             # Unpack threat info, including the stone coordinates (ignored for line drawing)
             threat_type, start_pos_tuple, end_pos_tuple, direction, _ = threat_info
 
             start_r, start_c = start_pos_tuple
             end_r, end_c = end_pos_tuple
 
-            start_pos_screen = (self.start_x + start_c * self.cell_size, self.start_y + start_r * self.cell_size)
-            end_pos_screen = (self.start_x + end_c * self.cell_size, self.start_y + end_r * self.cell_size)
-            line_coords = self._get_coords_on_line(start_pos_tuple, end_pos_tuple, direction)
-            intersects = any(coord in intersection_points for coord in line_coords)
+            start_pos_screen = (self._col_px[start_c], self._row_px[start_r])
+            end_pos_screen = (self._col_px[end_c], self._row_px[end_r])
+            intersects = is_intersection[rr, cc].any()
             if intersects:
                 threat_color = RED
             else:
@@ -1007,19 +1036,19 @@ class Game:
                 if threat_type == THREAT_OPEN_THREE: threat_color = (0, 150, 255)
                 elif threat_type == THREAT_CLOSED_FOUR: threat_color = (255, 165, 0)
                 elif threat_type == THREAT_OPEN_FOUR: threat_color = (255, 69, 0)
-            pygame.draw.line(self.screen, threat_color, start_pos_screen, end_pos_screen, THREAT_LINE_WIDTH)
+            pygame.draw.line(surface, threat_color, start_pos_screen, end_pos_screen, THREAT_LINE_WIDTH)
 
         # --- 勝利ラインの描画 (using self.cell_size) --- #
         if current_win_line:
             start_pos_tuple_win, end_pos_tuple_win, direction_win = current_win_line
             start_r_win, start_c_win = start_pos_tuple_win
             end_r_win, end_c_win = end_pos_tuple_win
-            start_pos_screen_win = (self.start_x + start_c_win * self.cell_size, self.start_y + start_r_win * self.cell_size)
-            end_pos_screen_win = (self.start_x + end_c_win * self.cell_size, self.start_y + end_r_win * self.cell_size)
+            start_pos_screen_win = (self._col_px[start_c_win], self._row_px[start_r_win])
+            end_pos_screen_win = (self._col_px[end_c_win], self._row_px[end_r_win])
             win_color = RED
-            pygame.draw.line(self.screen, win_color, start_pos_screen_win, end_pos_screen_win, WIN_LINE_WIDTH)
+            pygame.draw.line(surface, win_color, start_pos_screen_win, end_pos_screen_win, WIN_LINE_WIDTH)
 
-    def _draw_status_and_turn(self):
+    def _draw_status_and_turn(self, surface):
         """Draws the top status text (turn/history) and player indicator stone."""
         status_text_str = ""
         if self.is_history_mode:
@@ -1039,9 +1068,9 @@ class Game:
         # Background rectangle centered with the text
         bg_rect = status_rect.inflate(60, 10) # Increased horizontal padding
         bg_rect.center = status_rect.center # Ensure bg is centered on text
-        pygame.draw.rect(self.screen, BOARD_COLOR, bg_rect, border_radius=5)
-        pygame.draw.rect(self.screen, LINE_COLOR, bg_rect, 1, border_radius=5)
-        self.screen.blit(status_text, status_rect)
+        pygame.draw.rect(surface, BOARD_COLOR, bg_rect, border_radius=5)
+        pygame.draw.rect(surface, LINE_COLOR, bg_rect, 1, border_radius=5)
+        surface.blit(status_text, status_rect)
 
         # Turn indicator circle (Positioned LEFT of the text background)
         # Define top_status_y in reset_game or here if static
@@ -1052,16 +1081,12 @@ class Game:
             indicator_x = bg_rect.left - 20 # Position left of the background rect
             indicator_y = top_status_y # Align vertically with the status text center
             indicator_color = BLACK if current_player_at_index == BOARD_BLACK else WHITE
-            pygame.draw.circle(self.screen, indicator_color, (indicator_x, indicator_y), indicator_radius)
-            pygame.draw.circle(self.screen, TEXT_COLOR, (indicator_x, indicator_y), indicator_radius, 1)
-
-        self.back_button.draw(self.screen) # Draw menu button (already positioned top-right)
+            pygame.draw.circle(surface, indicator_color, (indicator_x, indicator_y), indicator_radius)
+            pygame.draw.circle(surface, TEXT_COLOR, (indicator_x, indicator_y), indicator_radius, 1)
 
     def _draw_game_over_overlay(self):
         """Draws the semi-transparent overlay and game over message/buttons."""
-        overlay_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay_surface.fill(GAMEOVER_OVERLAY_COLOR)
-        self.screen.blit(overlay_surface, (0, 0))
+        self.screen.blit(self._gameover_overlay, (0, 0))
 
         # Determine message
         if self.winner is None:
@@ -1076,119 +1101,184 @@ class Game:
         self.screen.blit(message_render, message_rect)
 
         # Draw buttons
-        self.rematch_button.draw(self.screen)
-        self.menu_button_gameover.draw(self.screen)
-
-    def _get_ai_for_evaluation(self):
-         """Gets an AIHard instance configured for evaluation (can be cached)."""
-         # Simple caching example, could be more robust
-         if not hasattr(self, '_eval_ai') or self._eval_ai is None:
-              # Use settings or default values for depth/time limit for evaluation
-              # Using a lower depth for responsiveness might be good
-              self._eval_ai = AIHard(self.current_player, depth=2, time_limit_sec=0.1)
-         # Ensure AI player matches current player context if needed for eval
-         # self._eval_ai.player = self.current_player # Might not be needed if eval is generic
-         return self._eval_ai
+        draw_buttons(self.screen, (self.rematch_button, self.menu_button_gameover))
+
+    def _hash_board(self, board):
+        """Calculates the Zobrist hash of a whole board (XOR over all stones)."""
+        rows, cols = np.nonzero(board.grid != EMPTY)
+        player_indices = np.where(board.grid[rows, cols] == BOARD_BLACK, ZOBRIST_PLAYERS[BOARD_BLACK], ZOBRIST_PLAYERS[BOARD_WHITE])
+        return np.bitwise_xor.reduce(self.zobrist_table[rows, cols, player_indices])
 
     def _evaluate_empty_cells(self):
-        """Calculates evaluation scores using AI's static board evaluation."""
-        if self.evaluation_in_progress:
-            return
+        """Starts evaluating the empty cells using AI's static board evaluation.
+
+        Memoized scores are filled in immediately; the rest are computed on a
+        background thread and collected by update() as they arrive. Starting a
+        new evaluation supersedes one that is still running.
+        """
+        self.evaluation_generation += 1 # Results of any earlier sweep still running are dropped
         self.evaluation_in_progress = True
-        print("Evaluating empty cells using static evaluation...") # Debug
+        if DEBUG: print("Evaluating empty cells using static evaluation...") # Debug
         self.evaluation_cache.clear()
         board_to_eval = self._get_current_board_for_display()
         # Evaluate from the perspective of the player whose turn it is *at this display index*
         player_to_eval = BOARD_BLACK if self.display_move_index % 2 == 0 else BOARD_WHITE
-        move_count_at_index = self.display_move_index
-
-        eval_ai = self._get_ai_for_evaluation()
-        eval_ai.player = player_to_eval # Set AI context for evaluation perspective
 
-        empty_cells = board_to_eval.get_empty_cells()
-
-        for r, c in empty_cells:
-            # Basic validity check (empty cell) - forbidden check is complex, rely on AI eval
-            if not board_to_eval.is_within_bounds(r,c) or not board_to_eval.is_empty(r,c):
-                self.evaluation_cache[(r, c)] = None
+        # Collect the candidate cells; forbidden moves are filtered out here
+        candidate_rs, candidate_cs = [], []
+        for r, c in board_to_eval.get_empty_cells():
+            # Check if the move is forbidden for Black *before* evaluating
+            # (_is_forbidden temporarily places/removes the stone itself)
+            if player_to_eval == BOARD_BLACK and board_to_eval._is_forbidden(r, c, player_to_eval):
+                self.evaluation_cache[(r, c)] = None # Mark forbidden as None/Invalid
                 continue
+            candidate_rs.append(r)
+            candidate_cs.append(c)
+
+        candidate_rs = np.array(candidate_rs, dtype=np.int64)
+        candidate_cs = np.array(candidate_cs, dtype=np.int64)
+        candidates = list(zip(candidate_rs.tolist(), candidate_cs.tolist()))
+
+        # Reuse memoized scores: the key is the hash of the position *after* the move
+        position_hash = self._hash_board(board_to_eval) if self.is_history_mode else self.position_hash
+        move_hashes = position_hash ^ self.zobrist_table[candidate_rs, candidate_cs, ZOBRIST_PLAYERS[player_to_eval]]
+        keys = [(move_hash, player_to_eval) for move_hash in move_hashes.tolist()]
+        misses = []
+        for i, key in enumerate(keys):
+            score = self.evaluation_lru.get(key)
+            if score is None:
+                misses.append(i)
+            else:
+                self.evaluation_lru.move_to_end(key)
+                self.evaluation_cache[candidates[i]] = score
+
+        if misses:
+            # The worker gets its own copy of the grid: the board keeps changing on the main thread
+            threading.Thread(
+                target=self._run_evaluation_worker,
+                args=(self.evaluation_generation, board_to_eval.grid.copy(),
+                      candidate_rs[misses], candidate_cs[misses], player_to_eval,
+                      [candidates[i] for i in misses], [keys[i] for i in misses]),
+                daemon=True,
+            ).start()
+        else:
+            print(f"Evaluation complete. Cached {len(self.evaluation_cache)} scores.")
+            self.evaluation_in_progress = False
+        self.needs_redraw = True
+        self.static_layer_dirty = True
 
-            # Simulate move and call evaluate_board
-            temp_board_copy = board_to_eval.copy()
-            temp_board_copy.grid[r, c] = player_to_eval
-            temp_board_copy.last_move = (r, c)
+    def _run_evaluation_worker(self, generation, grid, rs, cs, player_to_eval, cells, keys):
+        """Background thread: scores the cells batch by batch and queues the results.
 
-            # Check if the move is forbidden for Black *before* evaluating
-            is_forbidden = False
-            if player_to_eval == BOARD_BLACK:
-                 # Use the board's method to check forbidden status after placing the stone
-                 is_forbidden = temp_board_copy._is_forbidden(r, c, player_to_eval)
-                 # Note: _is_forbidden temporarily places/removes stone, so our copy is fine
-                 # We need to re-place it for the evaluation function if it wasn't forbidden
-                 if not is_forbidden:
-                      temp_board_copy.grid[r, c] = player_to_eval # Ensure stone is placed for eval
-                 else:
-                      self.evaluation_cache[(r, c)] = None # Mark forbidden as None/Invalid
-                      # print(f"DEBUG: Skipping evaluation for forbidden move at ({r},{c})")
-                      continue # Skip evaluation for forbidden moves
+        The candidates are already validated (empty, not forbidden), so the sweep
+        is not expected to raise; if it does, the rest of the run is marked failed.
+        """
+        start = 0
+        try:
+            for start in range(0, len(cells), EVALUATION_BATCH_SIZE):
+                if generation != self.evaluation_generation:
+                    return # Superseded by a newer evaluation or a reset
+                stop = start + EVALUATION_BATCH_SIZE
+                scores = np.empty(len(cells[start:stop]), dtype=np.int64)
+                # Static evaluation of the board *after* each move, relative to player_to_eval.
+                # The kernel releases the GIL and runs in parallel over the cells when numba is available.
+                with self._evaluation_lock:
+                    _evaluate_moves(grid, rs[start:stop], cs[start:stop], player_to_eval, scores)
+                self.evaluation_results.put((generation, cells[start:stop], keys[start:stop], scores.tolist()))
+        except Exception as e:
+            print(f"Error evaluating empty cells: {e}")
+            self.evaluation_results.put((generation, cells[start:], keys[start:], None))
+        self.evaluation_results.put((generation, None, None, None)) # Sweep finished
 
+    def _collect_evaluation_results(self):
+        """Moves queued evaluation batches into the caches (main thread only)."""
+        while True:
             try:
-                # Call static evaluation for the board state *after* the move
-                # The score is relative to the 'eval_ai.player' (which is player_to_eval)
-                # Remove extra arguments player_to_eval and move_count_at_index + 1
-                score = eval_ai._evaluate_board(temp_board_copy)
-                self.evaluation_cache[(r, c)] = score
-                # print(f"DEBUG: Evaluated ({r},{c}) score: {score}") # Debug
-            except Exception as e:
-                 print(f"Error evaluating ({r},{c}): {e}")
-                 self.evaluation_cache[(r, c)] = "Err"
-
-        print(f"Evaluation complete. Cached {len(self.evaluation_cache)} scores.")
-        self.evaluation_in_progress = False
-        self.needs_redraw = True
+                generation, cells, keys, scores = self.evaluation_results.get_nowait()
+            except queue.Empty:
+                return
+            if generation != self.evaluation_generation:
+                continue # Batch of a superseded evaluation
+            if cells is None:
+                print(f"Evaluation complete. Cached {len(self.evaluation_cache)} scores.")
+                self.evaluation_in_progress = False
+                continue
+            if scores is None:
+                for cell in cells:
+                    self.evaluation_cache[cell] = "Err"
+            else:
+                for cell, key, score in zip(cells, keys, scores):
+                    self.evaluation_cache[cell] = score
+                    self.evaluation_lru[key] = score
+                while len(self.evaluation_lru) > EVALUATION_LRU_MAX_ENTRIES:
+                    self.evaluation_lru.popitem(last=False) # Evict the least recently used entry
+            self.needs_redraw = True
+            self.static_layer_dirty = True
 
     def _add_text_popup(self, text, pos_on_board, color, duration=1000):
         """Creates and adds a TextPopup instance near the board position."""
         row, col = pos_on_board
-        target_center_x = self.start_x + col * self.cell_size
-        target_center_y = self.start_y + row * self.cell_size
+        target_center_x = self._col_px[col]
+        target_center_y = self._row_px[row]
         # Use a smaller font for these popups maybe?
         popup_font = self.font # Using the standard button font for now
         popup = TextPopup(text, (target_center_x, target_center_y), popup_font, duration, color)
         popup.show() # Activate it immediately
-        self.text_popups.append(popup)
-        print(f"DEBUG: Added text popup: '{text}' at {pos_on_board}") # Debug
+        self.text_popups.add(popup)
+        if DEBUG: print(f"DEBUG: Added text popup: '{text}' at {pos_on_board}") # Debug
 
     def draw(self):
-        """Draws the entire game screen, adapting to board size."""
-        if self.needs_redraw:
-            self._draw_board()             # Uses self.start_x/y, self.cell_size
-            self._draw_stones_and_markers()# Uses self.start_x/y, self.cell_size
-            self._draw_threat_and_win_lines()# Uses self.start_x/y, self.cell_size
-            self._draw_status_and_turn()   # Positioned top-center/left
-            # Draw other UI elements (already positioned in reset_game relative to screen)
-            self.prev_move_button.draw(self.screen)
-            self.next_move_button.draw(self.screen)
-            self.save_button.draw(self.screen)
-            self.research_mode_checkbox.draw(self.screen)
-            # self.joseki_popup.draw(self.screen) # Removed JosekiPopup draw call
-
-            # Draw Text Popups
-            for popup in self.text_popups:
-                 popup.draw(self.screen)
-
-            # Game Over overlay (only if game is actually over and not in history mode)
-            if self.game_over and not self.is_history_mode:
-                self._draw_game_over_overlay()
-                # Game over buttons are drawn within the overlay function now or kept separate?
-                # Keep separate for consistency:
-                self.rematch_button.draw(self.screen)
-                self.menu_button_gameover.draw(self.screen)
-
-            self.needs_redraw = False
-
-        # Draw Telop last (outside the needs_redraw block)
-        # Telop draw itself checks if active
-        self.telop.draw(self.screen)
+        """Draws the game screen and returns the list of screen rects that changed.
+           The static layer (board, stones, scores, threat lines, status) is re-rendered only
+           when the game state changed; otherwise only the areas covered by last frame's
+           overlays are restored from it before the overlays are drawn again."""
+        if not self.needs_redraw and not self.telop.active and not self._transient_overlays_drawn:
+            return [] # Nothing changed on screen
+
+        if self.static_layer_dirty:
+            self._draw_board(self._static_layer)             # Uses self.start_x/y, self.cell_size
+            self._draw_stones_and_markers(self._static_layer)# Uses self.start_x/y, self.cell_size
+            self._draw_threat_and_win_lines(self._static_layer)# Uses self.start_x/y, self.cell_size
+            self._draw_status_and_turn(self._static_layer)   # Positioned top-center/left
+            self.static_layer_dirty = False
+            self._overlay_rects = [self.screen.get_rect()] # Restore the whole screen below
+
+        # Restore the static layer under last frame's overlays
+        dirty_rects = self._overlay_rects
+        for rect in dirty_rects:
+            self.screen.blit(self._static_layer, rect, rect)
+
+        # --- Overlays, redrawn every frame --- #
+        overlay_rects = self._draw_animations() # Placing stone, invalid click, blinking stones
+        transient_drawn = bool(overlay_rects)
+        # Draw other UI elements (already positioned in reset_game relative to screen)
+        toolbar_buttons = (self.back_button, self.prev_move_button, self.next_move_button, self.save_button)
+        draw_buttons(self.screen, toolbar_buttons)
+        overlay_rects.extend(button.rect for button in toolbar_buttons)
+        self.research_mode_checkbox.draw(self.screen)
+        overlay_rects.append(self.research_mode_checkbox.image_rect)
+
+        # Draw Text Popups (one batched blit call for the whole group)
+        self.text_popups.draw(self.screen)
+        popup_rects = [popup.rect.copy() for popup in self.text_popups] # Copies: popups move every update
+        overlay_rects.extend(popup_rects)
+        transient_drawn = transient_drawn or bool(popup_rects)
+
+        # Game Over overlay (only if game is actually over and not in history mode)
+        if self.game_over and not self.is_history_mode:
+            self._draw_game_over_overlay() # Also draws the Rematch/Menu buttons
+            overlay_rects.append(self.screen.get_rect())
+
+        self.needs_redraw = False
 
-        # No need to flip here, handled in main loop after all updates/draws 
\ No newline at end of file
+        # Draw Telop last; Telop draw itself checks if active
+        self.telop.draw(self.screen)
+        if self.telop.active:
+            overlay_rects.append(self.telop.bg_rect)
+            transient_drawn = True
+
+        # One more frame after transient overlays end, so their last frame gets cleared
+        self._transient_overlays_drawn = transient_drawn
+        self._overlay_rects = overlay_rects
+        # No need to flip here: the main loop updates the returned rects
+        return dirty_rects + overlay_rects 
\ No newline at end of file
@@ -1,104 +1,242 @@
 import json
+import os
+import numpy as np
 import pygame
 from constants import (
-    POPUP_BG_COLOR, POPUP_TEXT_COLOR, SCREEN_WIDTH, SCREEN_HEIGHT
+    POPUP_BG_COLOR, POPUP_TEXT_COLOR, SCREEN_WIDTH, SCREEN_HEIGHT,
+    DEFAULT_BOARD_SIZE
 )
 
+try:
+    from numba import njit # Optional: compiles the symmetry transform to machine code
+    joseki_fast = None # numba already compiles the kernel; the Cython build is not needed
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: the kernel runs as plain Python."""
+        return lambda func: func
+    try:
+        import joseki_fast # Optional: ahead-of-time compiled kernel (cythonize -i joseki_fast.pyx)
+    except ImportError:
+        joseki_fast = None
+
 JOSEKI_FILE = 'joseki.json'
+JOSEKI_CACHE_FILE = 'joseki.npz' # Preprocessed copy of JOSEKI_FILE, rebuilt when the JSON is newer
+
+def _parse_joseki_file(filename):
+    """Parses and validates the joseki JSON file.
 
-def load_joseki(filename=JOSEKI_FILE):
-    """Loads joseki patterns from a JSON file."""
+    Returns:
+        list: dicts with 'name', 'moves' ((L, 2) int8 array) and 'is_shukei'.
+    """
+    with open(filename, 'r', encoding='utf-8') as f:
+        joseki_data = json.load(f)
+    # Validate and process each joseki entry
+    validated_data = []
+    for joseki in joseki_data:
+        if 'name' not in joseki or 'moves' not in joseki:
+            print(f"Warning: Skipping invalid joseki entry (missing name or moves): {joseki}")
+            continue
+        joseki['moves'] = np.array(joseki['moves'], dtype=np.int8).reshape(-1, 2)
+        # Get 'is_shukei' value, default to False if missing for backward compatibility
+        # (Although we updated the file, this makes the code more robust)
+        joseki['is_shukei'] = joseki.get('is_shukei', False)
+        validated_data.append(joseki)
+    return validated_data
+
+def _load_joseki_cache(filename, cache_filename):
+    """Loads the preprocessed joseki list if the cache is newer than the JSON file, else None."""
+    try:
+        if os.path.getmtime(cache_filename) < os.path.getmtime(filename):
+            return None # JSON was edited after the cache was written
+        with np.load(cache_filename) as cache:
+            names = cache['names'].tolist()
+            is_shukei = cache['is_shukei'].tolist()
+            # All moves are stored back to back; lengths splits them per joseki
+            moves = np.split(cache['moves'], np.cumsum(cache['lengths'])[:-1])
+    except (OSError, KeyError, ValueError):
+        return None # Missing or unreadable cache: fall back to the JSON file
+    return [
+        {'name': name, 'moves': joseki_moves, 'is_shukei': shukei}
+        for name, joseki_moves, shukei in zip(names, moves, is_shukei)
+    ]
+
+def _save_joseki_cache(joseki_list, cache_filename):
+    """Writes the preprocessed joseki list as flat numpy arrays (no pickled objects)."""
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            joseki_data = json.load(f)
-        # Validate and process each joseki entry
-        validated_data = []
-        for joseki in joseki_data:
-            if 'name' not in joseki or 'moves' not in joseki:
-                print(f"Warning: Skipping invalid joseki entry (missing name or moves): {joseki}")
-                continue
-            joseki['moves'] = [tuple(move) for move in joseki['moves']]
-            # Get 'is_shukei' value, default to False if missing for backward compatibility
-            # (Although we updated the file, this makes the code more robust)
-            joseki['is_shukei'] = joseki.get('is_shukei', False)
-            validated_data.append(joseki)
-
-        print(f"Loaded {len(validated_data)} joseki patterns from {filename}")
-        return validated_data
-    except FileNotFoundError:
-        print(f"Error: Joseki file '{filename}' not found.")
-        return []
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from '{filename}'.")
-        return []
+        with open(cache_filename, 'wb') as f:
+            np.savez(
+                f,
+                names=np.array([joseki['name'] for joseki in joseki_list], dtype=str),
+                is_shukei=np.array([joseki['is_shukei'] for joseki in joseki_list], dtype=bool),
+                lengths=np.array([len(joseki['moves']) for joseki in joseki_list], dtype=np.int64),
+                moves=np.concatenate([joseki['moves'] for joseki in joseki_list]) if joseki_list else np.zeros((0, 2), dtype=np.int8),
+            )
+    except OSError as e:
+        print(f"Warning: Could not write joseki cache '{cache_filename}': {e}")
+
+def load_joseki(filename=JOSEKI_FILE, board_size=DEFAULT_BOARD_SIZE, cache_filename=JOSEKI_CACHE_FILE):
+    """Loads joseki patterns from a JSON file (via its preprocessed cache when up to date).
+
+    Moves are stored as (L, 2) int8 arrays. Each entry also gets 'variants':
+    its moves under every allowed symmetry (8 for Shukei, 4 rotations
+    otherwise) as a (T, L, 2) int8 array, precomputed once for the given
+    board size, and 'orbit': the distinct variants as tuples of (row, col).
+    """
+    validated_data = _load_joseki_cache(filename, cache_filename)
+    source = cache_filename
+    if validated_data is None:
+        try:
+            validated_data = _parse_joseki_file(filename)
+        except FileNotFoundError:
+            print(f"Error: Joseki file '{filename}' not found.")
+            return []
+        except json.JSONDecodeError:
+            print(f"Error: Could not decode JSON from '{filename}'.")
+            return []
+        _save_joseki_cache(validated_data, cache_filename)
+        source = filename
+
+    for joseki in validated_data:
+        num_transformations = 8 if joseki['is_shukei'] else 4
+        joseki['variants'] = np.stack([
+            transform_moves(joseki['moves'], transform_idx, board_size)
+            for transform_idx in range(num_transformations)
+        ])
+        # Distinct variants only: symmetric joseki (e.g. along a diagonal) map onto
+        # themselves under part of the group, so their orbit has fewer than 8 members
+        joseki['orbit'] = tuple(dict.fromkeys(
+            tuple(map(tuple, variant)) for variant in joseki['variants'].tolist()
+        ))
+
+    print(f"Loaded {len(validated_data)} joseki patterns from {source}")
+    return validated_data
+
+@njit(cache=True, nogil=True)
+def _transform_moves_into(moves, transformation_index, size_m1, out):
+    """Writes the image of (N, 2) int8 `moves` under one of the 8 symmetries into `out`."""
+    for i in range(moves.shape[0]):
+        r = moves[i, 0]
+        c = moves[i, 1]
+        if transformation_index == 0:   # Identity
+            out[i, 0], out[i, 1] = r, c
+        elif transformation_index == 1: # Rotate 90 CW
+            out[i, 0], out[i, 1] = c, size_m1 - r
+        elif transformation_index == 2: # Rotate 180
+            out[i, 0], out[i, 1] = size_m1 - r, size_m1 - c
+        elif transformation_index == 3: # Rotate 270 CW
+            out[i, 0], out[i, 1] = size_m1 - c, r
+        elif transformation_index == 4: # Flip Horizontal
+            out[i, 0], out[i, 1] = r, size_m1 - c
+        elif transformation_index == 5: # Flip + Rotate 90 CW
+            out[i, 0], out[i, 1] = size_m1 - c, size_m1 - r
+        elif transformation_index == 6: # Flip + Rotate 180
+            out[i, 0], out[i, 1] = size_m1 - r, c
+        else:                           # Flip + Rotate 270 CW
+            out[i, 0], out[i, 1] = c, r
+
+if joseki_fast is not None:
+    _transform_moves_into = joseki_fast.transform_moves_into
 
 def transform_moves(moves, transformation_index, board_size):
     """Applies one of 8 symmetries to a list of moves.
 
     Args:
-        moves (list): List of (row, col) tuples.
+        moves (list | np.ndarray): (row, col) pairs.
         transformation_index (int): 0-7 representing the transformation.
             0: Identity, 1-3: Rotations 90, 180, 270 CW
             4: Flip Horizontal, 5-7: Flip Horiz + Rotations 90, 180, 270 CW
         board_size (int): The size of the board (e.g., 15).
 
     Returns:
-        list: List of transformed (row, col) tuples.
+        np.ndarray: (N, 2) int8 array of transformed (row, col) pairs.
+    """
+    arr = np.ascontiguousarray(moves, dtype=np.int8).reshape(-1, 2) # Board coordinates always fit in int8
+    out = np.empty_like(arr)
+    _transform_moves_into(arr, transformation_index, board_size - 1, out)
+    return out
+
+def build_joseki_trie(joseki_list):
+    """Builds a move trie containing every distinct symmetric image (orbit) of each joseki.
+
+    Each node is a dict: {'next': {(row, col): node}, 'joseki': joseki or None}.
+    A game can then be matched incrementally by following one edge per move
+    instead of re-transforming the whole history on every move.
+    The transform sets (4 rotations, or all 8 symmetries) are closed under
+    inversion, so storing transformed joseki is equivalent to transforming
+    the history.
+    """
+    root = {'next': {}, 'joseki': None}
+    for joseki in joseki_list:
+        for variant in joseki['orbit']:
+            node = root
+            for move in variant:
+                node = node['next'].setdefault(move, {'next': {}, 'joseki': None})
+            if node['joseki'] is None: # Keep the first listed joseki on identical variants
+                node['joseki'] = joseki
+    return root
+
+class JosekiMatcher:
+    """Tracks which joseki are still consistent with a game, one move at a time.
+
+    The surviving candidates are the children of the current trie node, so each
+    move costs one dict lookup and matching stops for good once the game leaves
+    every joseki.
+    """
+    def __init__(self, joseki_list):
+        self.trie = build_joseki_trie(joseki_list)
+        self.node = self.trie # None once no joseki can match any more
+
+    def push(self, move):
+        """Advances by one move. Returns the joseki completed by this move, or None."""
+        if self.node is None:
+            return None
+        self.node = self.node['next'].get(tuple(move))
+        if self.node is None:
+            return None
+        return self.node['joseki']
+
+def build_joseki_index(joseki_list):
+    """Builds a lookup of {length: (variants, owners)} for check_joseki (used by the demo below).
+
+    `variants` stacks the allowed symmetric images of every joseki of that length
+    into one (V, L, 2) int8 array, in joseki list order, and owners[v] is the joseki
+    that variant v belongs to. The length buckets let check_joseki reject a history
+    in O(1) when no joseki has its length.
+    """
+    buckets = {}
+    for joseki in joseki_list:
+        variants, owners = buckets.setdefault(len(joseki['moves']), ([], []))
+        variants.append(joseki['variants'])
+        owners.extend([joseki] * len(joseki['variants']))
+    return {
+        length: (np.concatenate(variants), owners)
+        for length, (variants, owners) in buckets.items()
+    }
+
+def check_joseki(move_history, joseki_index):
+    """Checks if the move history matches any joseki (any allowed symmetry).
+
+    The history is compared against every stored variant of its length in one
+    broadcast comparison, so it never needs transforming. The game itself matches
+    move by move with JosekiMatcher; this whole-history check serves the demo below.
     """
-    transformed = []
-    size_m1 = board_size - 1 # Pre-calculate size - 1
-    for r, c in moves:
-        nr, nc = r, c # Default to identity
-        if transformation_index == 1:   # Rotate 90 CW
-            nr, nc = c, size_m1 - r
-        elif transformation_index == 2: # Rotate 180 CW
-            nr, nc = size_m1 - r, size_m1 - c
-        elif transformation_index == 3: # Rotate 270 CW
-            nr, nc = size_m1 - c, r
-        elif transformation_index == 4: # Flip Horizontal
-            nr, nc = r, size_m1 - c
-        elif transformation_index == 5: # Flip Horiz + Rot 90
-            # Apply flip: (r, size_m1 - c), then rotate 90:
-            nr, nc = size_m1 - c, size_m1 - r
-        elif transformation_index == 6: # Flip Horiz + Rot 180
-            # Apply flip: (r, size_m1 - c), then rotate 180:
-            nr, nc = size_m1 - r, c
-        elif transformation_index == 7: # Flip Horiz + Rot 270
-            # Apply flip: (r, size_m1 - c), then rotate 270:
-            nr, nc = c, r
-
-        transformed.append((nr, nc))
-    return transformed
-
-def check_joseki(move_history, joseki_list, board_size):
-    """Checks if the move history matches any joseki based on its type (Shukei or other)."""
     current_len = len(move_history)
     if current_len == 0:
         return None
 
-    current_history_tuples = move_history # Assume history is already tuples
+    length_bucket = joseki_index.get(current_len)
+    if length_bucket is None:
+        return None # No joseki of this length: skip the comparison entirely
 
-    for joseki in joseki_list:
-        joseki_moves = joseki['moves']
-        is_shukei = joseki.get('is_shukei', False) # Default to False if key missing
-
-        # Only compare with joseki of the same length
-        if current_len == len(joseki_moves):
-            # Determine the range of transformations to check
-            num_transformations = 8 if is_shukei else 4 # 8 for Shukei (rot+flip), 4 for others (rot only)
-
-            for transform_idx in range(num_transformations):
-                transformed_history = transform_moves(
-                    current_history_tuples, transform_idx, board_size
-                )
-                if transformed_history == joseki_moves:
-                    transform_type = "Shukei" if is_shukei else "Joseki"
-                    print(
-                        f"{transform_type} detected: {joseki['name']} "
-                        f"(Transform index {transform_idx})"
-                    )
-                    return joseki['name'] # Return the name on match
-    return None # No match found
+    variants, owners = length_bucket
+    history = np.asarray(move_history, dtype=np.int8)
+    matches = np.flatnonzero((variants == history).all(axis=(1, 2)))
+    if matches.size == 0:
+        return None # No match found
+    joseki = owners[matches[0]] # First listed joseki wins on identical variants
+    transform_type = "Shukei" if joseki['is_shukei'] else "Joseki"
+    print(f"{transform_type} detected: {joseki['name']}")
+    return joseki['name'] # Return the name on match
 
 # --- JosekiPopup class removed as Telop is used instead --- #
 # class JosekiPopup:
@@ -165,14 +303,15 @@ if __name__ == '__main__':
     # (6, 7) -> (6, 7)
     kagetsu_flip_hist = [(7, 7), (6, 6), (7, 6), (8, 7), (6, 7)]
 
-    joseki_patterns = load_joseki()
+    joseki_patterns = load_joseki(board_size=BOARD_TEST_SIZE)
+    joseki_index = build_joseki_index(joseki_patterns)
     if joseki_patterns:
         print("\nTesting Joseki Checks (15x15 Board):")
-        match1 = check_joseki(kagetsu_hist, joseki_patterns, BOARD_TEST_SIZE)
+        match1 = check_joseki(kagetsu_hist, joseki_index)
         print(f"Original Kagetsu match: {match1}")
 
-        match2 = check_joseki(kagetsu_rot90_hist, joseki_patterns, BOARD_TEST_SIZE)
+        match2 = check_joseki(kagetsu_rot90_hist, joseki_index)
         print(f"Rotated Kagetsu match: {match2}") # Should match Kagetsu
 
-        match3 = check_joseki(kagetsu_flip_hist, joseki_patterns, BOARD_TEST_SIZE)
+        match3 = check_joseki(kagetsu_flip_hist, joseki_index)
         print(f"Flipped Kagetsu match: {match3}") # Should match Kagetsu 
\ No newline at end of file
@@ -0,0 +1,30 @@
+# cython: boundscheck=False, wraparound=False, language_level=3
+"""Ahead-of-time compiled joseki symmetry transform for installs without numba.
+
+Build in place with `cythonize -i joseki_fast.pyx`; joseki.py picks it up
+automatically and falls back to plain Python when it is missing.
+"""
+
+def transform_moves_into(signed char[:, ::1] moves, int transformation_index, int size_m1, signed char[:, ::1] out):
+    """Writes the image of (N, 2) int8 `moves` under one of the 8 symmetries into `out`."""
+    cdef Py_ssize_t i
+    cdef signed char r, c
+    for i in range(moves.shape[0]):
+        r = moves[i, 0]
+        c = moves[i, 1]
+        if transformation_index == 0:   # Identity
+            out[i, 0] = r; out[i, 1] = c
+        elif transformation_index == 1: # Rotate 90 CW
+            out[i, 0] = c; out[i, 1] = size_m1 - r
+        elif transformation_index == 2: # Rotate 180
+            out[i, 0] = size_m1 - r; out[i, 1] = size_m1 - c
+        elif transformation_index == 3: # Rotate 270 CW
+            out[i, 0] = size_m1 - c; out[i, 1] = r
+        elif transformation_index == 4: # Flip Horizontal
+            out[i, 0] = r; out[i, 1] = size_m1 - c
+        elif transformation_index == 5: # Flip + Rotate 90 CW
+            out[i, 0] = size_m1 - c; out[i, 1] = size_m1 - r
+        elif transformation_index == 6: # Flip + Rotate 180
+            out[i, 0] = size_m1 - r; out[i, 1] = c
+        else:                           # Flip + Rotate 270 CW
+            out[i, 0] = c; out[i, 1] = r
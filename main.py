@@ -2,7 +2,9 @@ import pygame
 import sys
 import json # Import json module
 import os # Import os module for listing files
-import glob # Import glob for pattern matching
+import fnmatch # Save file name pattern matching
+import numpy as np # Bulk validation of loaded move histories
+from concurrent.futures import ThreadPoolExecutor # Parallel stats for large save folders
 from constants import (
     SCREEN_WIDTH,
     SCREEN_HEIGHT,
@@ -17,13 +19,48 @@ from constants import (
     PLAYER_HUMAN,
     STATE_LOAD_SELECT, # Import new state
 )
-from ui import Button
+from ui import Button, ButtonGroup, get_font
 from settings import Settings
 from game import Game  # Import the Game class
+from ai import warm_up_evaluation
+
+# Events the menu, settings and load screens react to; SDL drops everything else while they are shown
+MENU_EVENT_TYPES = [
+    pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, # Clicks and hover feedback
+    pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, # Redraw when the window is uncovered
+]
+
+# Settings screen labels for each game mode
+MODE_LABELS = {
+    (PLAYER_HUMAN, PLAYER_HUMAN): "Human vs Human",
+    (PLAYER_HUMAN, PLAYER_AI): "Human vs AI",
+    (PLAYER_AI, PLAYER_HUMAN): "AI vs Human",
+    (PLAYER_AI, PLAYER_AI): "AI vs AI",
+}
 
 # --- Helper function for loading game data ---
+# Parsed saves by (path, mtime): browsing back to a save does not re-read it unless it changed
+_save_data_cache = {}
+
 def _load_game_data(filename="gomoku_save.json"):
-    """Loads game settings and move history from a JSON file."""
+    """Loads game settings and move history from a JSON file (memoized per file version)."""
+    try:
+        cache_key = (filename, os.stat(filename).st_mtime_ns)
+    except OSError:
+        cache_key = None # Missing file: _parse_game_data reports it
+    cached = _save_data_cache.get(cache_key)
+    if cached is not None:
+        print(f"Game data loaded from cache for {filename}")
+        settings_data, move_history = cached
+        return dict(settings_data), list(move_history)
+    settings_data, move_history = _parse_game_data(filename)
+    if settings_data is not None and cache_key is not None:
+        _save_data_cache[cache_key] = (settings_data, move_history)
+        settings_data, move_history = dict(settings_data), list(move_history)
+    return settings_data, move_history
+
+def _parse_game_data(filename):
+    """Reads and validates game settings and move history from a JSON file."""
     try:
         with open(filename, 'r') as f:
             data = json.load(f)
@@ -46,18 +83,25 @@ def _load_game_data(filename="gomoku_save.json"):
         if isinstance(data["settings"].get("game_mode"), list):
              data["settings"]["game_mode"] = tuple(data["settings"]["game_mode"])
 
-        # Validate move history format (list of lists/tuples with 2 ints)
+        # Validate move history format (list of [row, col] integer pairs) in one array conversion
         if not isinstance(data["move_history"], list):
              print(f"Error: Invalid move_history format in '{filename}'.")
              return None, None
-        for move in data["move_history"]:
-             if not (isinstance(move, (list, tuple)) and len(move) == 2 and
-                     isinstance(move[0], int) and isinstance(move[1], int)):
-                  print(f"Error: Invalid move format {move} in '{filename}'.")
-                  return None, None
+        try:
+            moves = np.asarray(data["move_history"]) if data["move_history"] else np.empty((0, 2), dtype=int)
+        except ValueError: # Ragged rows
+            moves = None
+        if moves is None or moves.ndim != 2 or moves.shape[1] != 2 or moves.dtype.kind != 'i':
+             print(f"Error: Invalid move format in '{filename}'.")
+             return None, None
+        # Bounds-check every coordinate against the saved board size in one comparison
+        board_size = data["settings"]["board_size"]
+        if isinstance(board_size, int) and ((moves < 0) | (moves >= board_size)).any():
+             print(f"Error: Move outside the {board_size}x{board_size} board in '{filename}'.")
+             return None, None
 
         print(f"Game data loaded successfully from {filename}")
-        return data["settings"], data["move_history"]
+        return data["settings"], moves.tolist()
 
     except FileNotFoundError:
         print(f"Error: Save file '{filename}' not found.")
@@ -70,13 +114,33 @@ def _load_game_data(filename="gomoku_save.json"):
         return None, None
 
 # --- Helper function to get save files ---
+SAVE_FILE_PATTERN = "gomoku_save_*.json"
+# Creating or deleting a save changes the directory's mtime, so the sorted list is reused until then
+_save_files_cache = {"dir_mtime": None, "files": []}
+SAVE_FILES_PARALLEL_STAT_THRESHOLD = 100 # Below this, starting the thread pool costs more than it saves
+
 def _get_save_files():
     """Returns a sorted list of save file names matching the pattern."""
     try:
-        files = glob.glob("gomoku_save_*.json")
-        # Sort by modification time, newest first
-        files.sort(key=os.path.getmtime, reverse=True)
-        return files
+        dir_mtime = os.stat(".").st_mtime_ns
+        if dir_mtime != _save_files_cache["dir_mtime"]:
+            # One directory read instead of a glob plus a separate getmtime call per file
+            save_entries = [
+                entry for entry in os.scandir(".")
+                if fnmatch.fnmatch(entry.name, SAVE_FILE_PATTERN) and entry.is_file()
+            ]
+            if len(save_entries) > SAVE_FILES_PARALLEL_STAT_THRESHOLD:
+                # os.stat releases the GIL, so many stats overlap (worth it on slow/network drives)
+                with ThreadPoolExecutor(max_workers=8) as executor:
+                    mtimes = list(executor.map(lambda entry: entry.stat().st_mtime, save_entries))
+            else:
+                mtimes = [entry.stat().st_mtime for entry in save_entries]
+            entries = [(mtime, entry.name) for mtime, entry in zip(mtimes, save_entries)]
+            # Sort by modification time, newest first
+            entries.sort(key=lambda entry: entry[0], reverse=True)
+            _save_files_cache["files"] = [name for _, name in entries]
+            _save_files_cache["dir_mtime"] = dir_mtime
+        return list(_save_files_cache["files"])
     except Exception as e:
         print(f"Error getting save files: {e}")
         return []
@@ -85,6 +149,11 @@ def main():
     pygame.init()
 
     settings = Settings()  # Create a Settings instance
+    if "--fast" in sys.argv[1:]:
+        # Fast play (e.g. AI vs AI self-play): skip threat analysis, animations and forced redraws
+        settings.animations_enabled = False
+
+    warm_up_evaluation() # JIT-compile the board evaluator once, before the menu appears
 
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Gomoku")
@@ -95,12 +164,12 @@ def main():
     current_game = None  # Placeholder for the active Game instance
 
     # --- Fonts ---
-    title_font = pygame.font.Font(None, 70)
-    menu_font = pygame.font.Font(None, 50)
-    settings_label_font = pygame.font.Font(None, 36)
-    settings_value_font = pygame.font.Font(None, 36)
-    settings_button_font = pygame.font.Font(None, 40)  # Font for < > buttons
-    list_font = pygame.font.Font(None, 36) # Font for file list
+    title_font = get_font(70)
+    menu_font = get_font(50)
+    settings_label_font = get_font(36)
+    settings_value_font = get_font(36)
+    settings_button_font = get_font(40)  # Font for < > buttons
+    list_font = get_font(36) # Font for file list
 
     # --- Menu UI Elements ---
     title_text = title_font.render("Gomoku", True, TEXT_COLOR)
@@ -180,8 +249,37 @@ def main():
         ai_difficulty_prev_button,
         ai_difficulty_next_button,
     ) = create_setting_controls("AI Difficulty:", y_offset)
+    ai_difficulty_label = ai_difficulty_label.convert_alpha() # Not baked into settings_bg, blitted every AI settings frame
     back_button = Button("Back", (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 80), menu_font)
 
+    settings_render_cache = {} # {(board_size, win_length, game_mode, ai_difficulty): renders}
+    value_render_cache = {} # {(setting name, text): (surface, rect)}, each value text rendered once
+
+    def render_setting_value(name, text, value_rect):
+        """Returns the (surface, rect) of one setting value, centered in its value rect."""
+        render = value_render_cache.get((name, text))
+        if render is None:
+            value_text = settings_value_font.render(text, True, GRAY).convert_alpha() # Blitted every settings frame
+            render = (value_text, value_text.get_rect(center=value_rect.center))
+            value_render_cache[(name, text)] = render
+        return render
+
+    def get_settings_renders(ai_active):
+        """Returns the rendered setting values, rendering them only when a setting changed."""
+        ai_difficulty_str = settings.ai_difficulty.capitalize() if ai_active else "N/A"
+        key = (settings.board_size, settings.win_length, settings.game_mode, ai_difficulty_str)
+        renders = settings_render_cache.get(key)
+        if renders is None:
+            # The key space is bounded by the setting options, so both caches stay small
+            renders = {
+                "board_size": render_setting_value("board_size", f"{settings.board_size}x{settings.board_size}", board_size_value_rect),
+                "win_length": render_setting_value("win_length", f"{settings.win_length}", win_length_value_rect),
+                "game_mode": render_setting_value("game_mode", MODE_LABELS.get(settings.game_mode, "Unknown"), game_mode_value_rect),
+                "ai_difficulty": render_setting_value("ai_difficulty", ai_difficulty_str, ai_difficulty_value_rect),
+            }
+            settings_render_cache[key] = renders
+        return renders
+
     # --- Load Game Select UI Elements ---
     load_title_text = menu_font.render("Load Game", True, TEXT_COLOR)
     load_title_rect = load_title_text.get_rect(center=(SCREEN_WIDTH // 2, 80))
@@ -201,218 +299,195 @@ def main():
     load_next_page_button = Button(">>", (SCREEN_WIDTH - load_list_x, page_nav_y), menu_font) # Adjusted x based on load_list_x
     load_back_button = Button("Back", (SCREEN_WIDTH // 2, page_nav_y), menu_font) # Align with page buttons
 
+    page_text = None # Rendered "Page x / y" label, refreshed with the list buttons
+    page_rect = None
+    num_pages = 1 # Page count of save_files, refreshed with the list buttons
+
+    # One button per list row, created once and relabelled on every page change
+    load_list_button_pool = [
+        Button("", (load_list_x + load_list_width / 2, load_list_y_start + row * load_list_line_height),
+               list_font, width=load_list_width - 20, height=35)
+        for row in range(files_per_page)
+    ]
+
     def update_load_list_buttons():
-        nonlocal load_list_buttons, save_files, current_page, files_per_page
+        nonlocal load_list_buttons, save_files, current_page, files_per_page, page_text, page_rect, num_pages, load_group
         load_list_buttons.clear()
         start_index = current_page * files_per_page
         end_index = min(start_index + files_per_page, len(save_files))
-        for i in range(start_index, end_index):
-            filename = os.path.basename(save_files[i]) # Show only filename
-            button_y = load_list_y_start + (i - start_index) * load_list_line_height
-            # Create button using the calculated x and width
-            button = Button(filename, (load_list_x + load_list_width / 2, button_y), list_font, width=load_list_width - 20, height=35)
-            # Add the full path as a custom attribute after creation
-            button.data = save_files[i]
+        for button, i in zip(load_list_button_pool, range(start_index, end_index)):
+            button.set_text(os.path.basename(save_files[i])) # Show only filename
+            button.data = save_files[i] # Full path, returned when clicked
+            button.is_hovering = False # Hover is picked up again by the next mouse motion
             load_list_buttons.append(button)
+        num_pages = max(1, (len(save_files) + files_per_page - 1) // files_per_page)
+        # Page buttons are hidden (and inactive) when there is no page to go to
+        nav_buttons = [load_back_button]
+        if current_page > 0:
+            nav_buttons.append(load_prev_page_button)
+        if current_page < num_pages - 1:
+            nav_buttons.append(load_next_page_button)
+        load_group = ButtonGroup(load_list_buttons + nav_buttons)
+        page_text = list_font.render(f"Page {current_page + 1} / {num_pages}", True, TEXT_COLOR).convert_alpha()
+        # Position page text above the buttons
+        page_rect = page_text.get_rect(center=(SCREEN_WIDTH // 2, page_nav_y - 40))
+
+    settings_buttons = [
+        board_size_prev_button, board_size_next_button,
+        win_length_prev_button, win_length_next_button,
+        game_mode_prev_button, game_mode_next_button,
+        back_button,
+    ]
+    ai_difficulty_buttons = [ai_difficulty_prev_button, ai_difficulty_next_button]
+    setting_cycle_buttons = { # button -> (Settings attribute, direction)
+        board_size_prev_button: ("board_size", -1), board_size_next_button: ("board_size", 1),
+        win_length_prev_button: ("win_length", -1), win_length_next_button: ("win_length", 1),
+        game_mode_prev_button: ("game_mode", -1), game_mode_next_button: ("game_mode", 1),
+        ai_difficulty_prev_button: ("ai_difficulty", -1), ai_difficulty_next_button: ("ai_difficulty", 1),
+    }
+
+    menu_group = ButtonGroup(menu_buttons)
+    settings_group = ButtonGroup(settings_buttons)
+    settings_ai_group = ButtonGroup(settings_buttons + ai_difficulty_buttons)
+    load_group = ButtonGroup([load_back_button]) # Rebuilt with the list and page buttons by update_load_list_buttons
+    no_buttons_group = ButtonGroup([])
+
+    def screen_group(state):
+        """Returns the button group of a menu screen (empty for the game screen, which handles its own)."""
+        if state == STATE_MENU:
+            return menu_group
+        if state == STATE_SETTINGS:
+            # The AI difficulty row is hidden (and inactive) unless a player is an AI
+            return settings_ai_group if PLAYER_AI in settings.game_mode else settings_group
+        if state == STATE_LOAD_SELECT:
+            return load_group
+        return no_buttons_group
+
+    # --- Static Backgrounds ---
+    # Everything on the menu/settings/load screens except buttons and values never changes,
+    # so it is composed once here and each frame starts with a single blit of it.
+    def create_background(*blits):
+        background = pygame.Surface(screen.get_size()).convert()
+        background.fill(WHITE)
+        for surface, rect in blits:
+            background.blit(surface, rect)
+        return background
+
+    menu_bg = create_background((title_text, title_rect))
+    settings_bg = create_background(
+        (settings_title_text, settings_title_rect),
+        (board_size_label, board_size_label_rect),
+        (win_length_label, win_length_label_rect),
+        (game_mode_label, game_mode_label_rect),
+    )
+    load_bg = create_background((load_title_text, load_title_rect))
+    screen_backgrounds = {STATE_MENU: menu_bg, STATE_SETTINGS: settings_bg, STATE_LOAD_SELECT: load_bg}
+
+    def set_event_filter(state):
+        """Lets SDL queue only the event types a screen handles (the game screen gets all of them)."""
+        if state == STATE_GAME:
+            pygame.event.set_allowed(None)
+        else:
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed(MENU_EVENT_TYPES)
 
     # --- Main Loop ---
     running = True
+    needs_redraw = True # Menu screens are only redrawn after input that can change them
+    event_filter_state = None # State whose event filter is currently installed
     while running:
-        ai_active = PLAYER_AI in settings.game_mode
-        settings_value_renders = {} # Initialize here, ensuring it always exists
-
-        # --- Render Setting Values (only when in settings state) ---
-        if game_state == STATE_SETTINGS:
-            board_size_value_text = settings_value_font.render(
-                f"{settings.board_size}x{settings.board_size}", True, GRAY
-            )
-            board_size_value_text_rect = board_size_value_text.get_rect(
-                center=board_size_value_rect.center
-            )
-            win_length_value_text = settings_value_font.render(
-                f"{settings.win_length}", True, GRAY
-            )
-            win_length_value_text_rect = win_length_value_text.get_rect(
-                center=win_length_value_rect.center
-            )
-            mode_map = {
-                (PLAYER_HUMAN, PLAYER_HUMAN): "Human vs Human",
-                (PLAYER_HUMAN, PLAYER_AI): "Human vs AI",
-                (PLAYER_AI, PLAYER_HUMAN): "AI vs Human",
-                (PLAYER_AI, PLAYER_AI): "AI vs AI",
-            }
-            game_mode_value_str = mode_map.get(settings.game_mode, "Unknown")
-            game_mode_value_text = settings_value_font.render(
-                game_mode_value_str, True, GRAY
-            )
-            game_mode_value_text_rect = game_mode_value_text.get_rect(
-                center=game_mode_value_rect.center
-            )
-            ai_difficulty_str = (
-                settings.ai_difficulty.capitalize() if ai_active else "N/A"
-            )
-            ai_difficulty_value_text = settings_value_font.render(
-                ai_difficulty_str, True, GRAY
-            )
-            ai_difficulty_value_text_rect = ai_difficulty_value_text.get_rect(
-                center=ai_difficulty_value_rect.center
-            )
-            # Store renders needed for drawing this frame
-            settings_value_renders = {
-                "board_size": (board_size_value_text, board_size_value_text_rect),
-                "win_length": (win_length_value_text, win_length_value_text_rect),
-                "game_mode": (game_mode_value_text, game_mode_value_text_rect),
-                "ai_difficulty": (
-                    ai_difficulty_value_text, ai_difficulty_value_text_rect
-                ),
-            }
+        if game_state != event_filter_state:
+            set_event_filter(game_state)
+            event_filter_state = game_state
 
         # --- Event Handling ---
-        mouse_pos = pygame.mouse.get_pos()
         for event in pygame.event.get():
+            if event.type != pygame.MOUSEMOTION:
+                needs_redraw = True # Clicks, keys, window events and state changes
             if event.type == pygame.QUIT:
                 running = False
                 game_state = STATE_QUIT
 
+            # Menu screens: hit-test each mouse event once; only the button under the cursor reacts
+            if game_state in (STATE_MENU, STATE_SETTINGS, STATE_LOAD_SELECT):
+                if event.type not in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN):
+                    continue # QUIT and expose events (already handled above) or leftovers from the game screen
+                button, result = screen_group(game_state).handle_event(event)
+                if result is None:
+                    continue
+
             # Handle events based on the current state
             if game_state == STATE_MENU:
-                for button in menu_buttons:
-                    result = button.handle_event(event)
-                    if result == "Start New Game":
-                        current_game = Game(screen, settings)
-                        game_state = STATE_GAME
-                        print("Starting New Game:", settings.get_setting_summary())
-                    elif result == "Load Game":
-                        # Transition to Load Select state
-                        save_files = _get_save_files()
-                        current_page = 0
-                        selected_file_index = -1
-                        update_load_list_buttons()
-                        game_state = STATE_LOAD_SELECT
-                        print(f"Entering Load Select. Found {len(save_files)} save files.")
-                    elif result == "Settings":
-                        game_state = STATE_SETTINGS
-                    elif result == "Quit":
-                        running = False
-                        game_state = STATE_QUIT
+                if result == "Start New Game":
+                    current_game = Game(screen, settings)
+                    game_state = STATE_GAME
+                    print("Starting New Game:", settings.get_setting_summary())
+                elif result == "Load Game":
+                    # Transition to Load Select state
+                    save_files = _get_save_files()
+                    current_page = 0
+                    selected_file_index = -1
+                    update_load_list_buttons()
+                    game_state = STATE_LOAD_SELECT
+                    print(f"Entering Load Select. Found {len(save_files)} save files.")
+                elif result == "Settings":
+                    game_state = STATE_SETTINGS
+                elif result == "Quit":
+                    running = False
+                    game_state = STATE_QUIT
 
             elif game_state == STATE_SETTINGS:
-                if back_button.handle_event(event) == "Back":
+                if button is back_button:
                     game_state = STATE_MENU
-                    continue
-
-                def cycle_setting(
-                    current_value, options_list, set_function, direction
-                ):
-                    try:
-                        current_index = options_list.index(current_value)
-                        new_index = (current_index + direction) % len(
-                            options_list
-                        )
-                        set_function(options_list[new_index])
-                    except ValueError:
-                        print(
-                            f"Error: Current value {current_value} not in options."
-                        )
-                        if options_list:
-                            set_function(options_list[0])
-
-                # Handle setting cycle buttons
-                if board_size_prev_button.handle_event(event) == "<":
-                    cycle_setting(
-                        settings.board_size, settings.board_size_options,
-                        settings.set_board_size, -1
-                    )
-                elif board_size_next_button.handle_event(event) == ">":
-                    cycle_setting(
-                        settings.board_size, settings.board_size_options,
-                        settings.set_board_size, 1
-                    )
-                elif win_length_prev_button.handle_event(event) == "<":
-                    cycle_setting(
-                        settings.win_length, settings.win_length_options,
-                        settings.set_win_length, -1
-                    )
-                elif win_length_next_button.handle_event(event) == ">":
-                    cycle_setting(
-                        settings.win_length, settings.win_length_options,
-                        settings.set_win_length, 1
-                    )
-                elif game_mode_prev_button.handle_event(event) == "<":
-                    cycle_setting(
-                        settings.game_mode, settings.game_mode_options,
-                        settings.set_game_mode, -1
-                    )
-                elif game_mode_next_button.handle_event(event) == ">":
-                    cycle_setting(
-                        settings.game_mode, settings.game_mode_options,
-                        settings.set_game_mode, 1
-                    )
-                elif ai_active:
-                    if ai_difficulty_prev_button.handle_event(event) == "<":
-                        cycle_setting(
-                            settings.ai_difficulty, settings.ai_difficulty_options,
-                            settings.set_ai_difficulty, -1
-                        )
-                    elif ai_difficulty_next_button.handle_event(event) == ">":
-                        cycle_setting(
-                            settings.ai_difficulty, settings.ai_difficulty_options,
-                            settings.set_ai_difficulty, 1
-                        )
+                else:
+                    # Handle setting cycle buttons
+                    settings.cycle_option(*setting_cycle_buttons[button])
 
             elif game_state == STATE_LOAD_SELECT:
                 # Handle Back button
-                if load_back_button.handle_event(event) == "Back":
+                if button is load_back_button:
                     game_state = STATE_MENU
                     continue
                 # Handle Page buttons
-                num_pages = (len(save_files) + files_per_page - 1) // files_per_page
-                if load_prev_page_button.handle_event(event) == "<<":
+                if button is load_prev_page_button:
                     if current_page > 0:
                         current_page -= 1
                         update_load_list_buttons()
-                elif load_next_page_button.handle_event(event) == ">>":
+                elif button is load_next_page_button:
                     if current_page < num_pages - 1:
                         current_page += 1
                         update_load_list_buttons()
 
-                # Handle File selection buttons
-                for i, button in enumerate(load_list_buttons):
-                     clicked_file_path = button.handle_event(event) # Returns button.data (full path)
-                     if clicked_file_path:
-                         print(f"Load selected: {clicked_file_path}")
-                         loaded_settings_data, loaded_moves = _load_game_data(clicked_file_path)
-                         if loaded_settings_data and loaded_moves is not None:
-                             # Update settings
-                             try:
-                                 settings.board_size = int(loaded_settings_data['board_size'])
-                                 settings.win_length = int(loaded_settings_data['win_length'])
-                                 loaded_game_mode = loaded_settings_data['game_mode']
-                                 if isinstance(loaded_game_mode, list):
-                                      settings.game_mode = tuple(loaded_game_mode)
-                                 elif isinstance(loaded_game_mode, tuple):
-                                      settings.game_mode = loaded_game_mode
-                                 else:
-                                      raise ValueError("Invalid game_mode type")
-                                 settings.ai_difficulty = str(loaded_settings_data['ai_difficulty'])
-                                 settings.ai_starts = bool(loaded_settings_data['ai_starts'])
-                             except Exception as e:
-                                  print(f"Error applying loaded settings: {e}")
-                                  continue # Stay in load select screen
-
-                             # Validate settings
-                             if settings.board_size not in settings.board_size_options:
-                                 print(f"Warning: Invalid board size {settings.board_size}")
-                                 continue
-
-                             # Start game with loaded data
-                             current_game = Game(screen, settings)
-                             current_game.reset_game(move_history_to_load=loaded_moves)
-                             game_state = STATE_GAME
-                             print("Loaded Game:", settings.get_setting_summary())
-                         else:
-                             print("Failed to load game data from selected file.")
-                         break # Exit file button loop once one is clicked
+                # Handle File selection buttons (button.data holds the full path)
+                elif button in load_list_buttons:
+                    clicked_file_path = result
+                    print(f"Load selected: {clicked_file_path}")
+                    loaded_settings_data, loaded_moves = _load_game_data(clicked_file_path)
+                    if loaded_settings_data and loaded_moves is not None:
+                        # Update settings
+                        try:
+                            settings.board_size = int(loaded_settings_data['board_size'])
+                            settings.win_length = int(loaded_settings_data['win_length'])
+                            loaded_game_mode = loaded_settings_data['game_mode']
+                            if isinstance(loaded_game_mode, list):
+                                 settings.game_mode = tuple(loaded_game_mode)
+                            elif isinstance(loaded_game_mode, tuple):
+                                 settings.game_mode = loaded_game_mode
+                            else:
+                                 raise ValueError("Invalid game_mode type")
+                            settings.ai_difficulty = str(loaded_settings_data['ai_difficulty'])
+                            settings.ai_starts = bool(loaded_settings_data['ai_starts'])
+                        except Exception as e: # Includes values that are not one of the setting options
+                             print(f"Error applying loaded settings: {e}")
+                             continue # Stay in load select screen
+
+                        # Start game with loaded data
+                        current_game = Game(screen, settings)
+                        current_game.reset_game(move_history_to_load=loaded_moves)
+                        game_state = STATE_GAME
+                        print("Loaded Game:", settings.get_setting_summary())
+                    else:
+                        print("Failed to load game data from selected file.")
 
             elif game_state == STATE_GAME:
                 if current_game:
@@ -426,73 +501,57 @@ def main():
             current_game.update()
 
         # --- Drawing by State ---
+        if game_state != STATE_GAME and not needs_redraw:
+            # Mouse motion only matters when it moved onto or off a button: repaint just those over the background
+            changed_buttons = [button for button in screen_group(game_state).buttons if button.dirty]
+            if changed_buttons:
+                dirty_rects = [button.get_dirty_rect() for button in changed_buttons]
+                background = screen_backgrounds[game_state]
+                screen.blits([(background, rect, rect) for rect in dirty_rects]
+                             + [button.blit_item() for button in changed_buttons], doreturn=False)
+                pygame.display.update(dirty_rects)
+            clock.tick(60)
+            continue
+        needs_redraw = False # The game screen keeps redrawing every frame (AI, animations)
         # screen.fill(WHITE)  # Remove default background fill here
+        dirty_rects = None # None: update the whole display
 
         if game_state == STATE_MENU:
-            screen.fill(WHITE) # Fill white only for menu
-            screen.blit(title_text, title_rect)
-            for button in menu_buttons:
-                button.draw(screen)
+            # One batched blit per frame: background, then every button
+            screen.blits([(menu_bg, (0, 0))] + [button.blit_item() for button in menu_buttons], doreturn=False)
 
         elif game_state == STATE_SETTINGS:
-            screen.fill(WHITE) # Fill white only for settings
-            screen.blit(settings_title_text, settings_title_rect)
-            # Draw settings controls and values
-            screen.blit(board_size_label, board_size_label_rect)
-            # Check if renders exist before blitting
-            if "board_size" in settings_value_renders:
-                 screen.blit(settings_value_renders["board_size"][0], settings_value_renders["board_size"][1])
-            board_size_prev_button.draw(screen)
-            board_size_next_button.draw(screen)
-            screen.blit(win_length_label, win_length_label_rect)
-            if "win_length" in settings_value_renders:
-                 screen.blit(settings_value_renders["win_length"][0], settings_value_renders["win_length"][1])
-            win_length_prev_button.draw(screen)
-            win_length_next_button.draw(screen)
-            screen.blit(game_mode_label, game_mode_label_rect)
-            if "game_mode" in settings_value_renders:
-                 screen.blit(settings_value_renders["game_mode"][0], settings_value_renders["game_mode"][1])
-            game_mode_prev_button.draw(screen)
-            game_mode_next_button.draw(screen)
+            # Values reflect this frame's events (the frame is not redrawn again until the next input)
+            ai_active = PLAYER_AI in settings.game_mode
+            settings_value_renders = get_settings_renders(ai_active)
+            blit_sequence = [(settings_bg, (0, 0))] # Title and labels
+            blit_sequence += [settings_value_renders[name] for name in ("board_size", "win_length", "game_mode")]
             if ai_active:
-                screen.blit(ai_difficulty_label, ai_difficulty_label_rect)
-                if "ai_difficulty" in settings_value_renders:
-                     screen.blit(settings_value_renders["ai_difficulty"][0], settings_value_renders["ai_difficulty"][1])
-                ai_difficulty_prev_button.draw(screen)
-                ai_difficulty_next_button.draw(screen)
-            back_button.draw(screen)
+                blit_sequence.append((ai_difficulty_label, ai_difficulty_label_rect))
+                blit_sequence.append(settings_value_renders["ai_difficulty"])
+            blit_sequence += [button.blit_item() for button in screen_group(STATE_SETTINGS).buttons]
+            screen.blits(blit_sequence, doreturn=False)
 
         elif game_state == STATE_LOAD_SELECT:
-            screen.fill(WHITE) # ★★★ Add background fill for Load Select ★★★
-            screen.blit(load_title_text, load_title_rect)
-            # Draw file list buttons
-            for button in load_list_buttons:
-                button.draw(screen)
-            # Draw page info and navigation buttons
-            num_pages = (len(save_files) + files_per_page - 1) // files_per_page
-            page_text = list_font.render(f"Page {current_page + 1} / {max(1, num_pages)}", True, TEXT_COLOR)
-            # Position page text above the buttons
-            page_rect = page_text.get_rect(center=(SCREEN_WIDTH // 2, page_nav_y - 40))
-            screen.blit(page_text, page_rect)
-            # Draw navigation buttons conditionally
-            if current_page > 0:
-                 load_prev_page_button.draw(screen)
-            if current_page < num_pages - 1:
-                 load_next_page_button.draw(screen)
-            load_back_button.draw(screen)
+            blit_sequence = [(load_bg, (0, 0)), (page_text, page_rect)] # page_text rendered by update_load_list_buttons
+            blit_sequence += [button.blit_item() for button in load_group.buttons] # List and visible navigation buttons
+            screen.blits(blit_sequence, doreturn=False)
 
         elif game_state == STATE_GAME:
             if current_game:
-                current_game.draw()  # Let the Game instance handle drawing (including its background)
+                dirty_rects = current_game.draw()  # Let the Game instance handle drawing; returns changed rects
             else:
                 # Fallback if game state is GAME but no instance exists
                 screen.fill(WHITE) # Fill white for error screen
-                font = pygame.font.Font(None, 30)
+                font = get_font(30)
                 text = font.render("Error: Game not initialized.", True, TEXT_COLOR)
                 rect = text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
                 screen.blit(text, rect)
 
-        pygame.display.flip()
+        if dirty_rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty_rects) # Only push the regions the game redrew
         clock.tick(60)
 
     pygame.quit()
@@ -12,14 +12,20 @@ from constants import (
 class Settings:
     """Stores and manages game settings."""
 
-    def __init__(self):
-        # Default settings
-        self.board_size = DEFAULT_BOARD_SIZE
-        self.win_length = DEFAULT_WIN_LENGTH  # How many stones in a row to win
-        self.game_mode = (PLAYER_HUMAN, PLAYER_AI)  # Default: Human vs AI
-        self.ai_starts = False  # Default: Human starts
-        self.ai_difficulty = AI_NORMAL  # Default: Normal AI
+    # Labels used by get_setting_summary
+    MODE_SUMMARY_LABELS = {
+        (PLAYER_HUMAN, PLAYER_HUMAN): "人間 vs 人間",
+        (PLAYER_HUMAN, PLAYER_AI):    "人間 vs AI",
+        (PLAYER_AI, PLAYER_HUMAN):    "AI vs 人間",
+        (PLAYER_AI, PLAYER_AI):        "AI vs AI",
+    }
+    DIFFICULTY_SUMMARY_LABELS = {
+        AI_EASY: "簡単",
+        AI_NORMAL: "普通",
+        AI_HARD: "難しい",
+    }
 
+    def __init__(self):
         # --- Possible values ---
         self.board_size_options = [9, 11, 13, 15, 17, 19]  # Example options
         self.win_length_options = list(range(3, 8))  # 3 to 7
@@ -30,10 +36,63 @@ class Settings:
             (PLAYER_AI, PLAYER_AI),        # AI vs AI (Maybe less common)
         ]
         self.ai_difficulty_options = [AI_EASY, AI_NORMAL, AI_HARD]
+        # value -> position in its options list, for O(1) validation
+        self._board_size_index = {v: i for i, v in enumerate(self.board_size_options)}
+        self._win_length_index = {v: i for i, v in enumerate(self.win_length_options)}
+        self._game_mode_index = {v: i for i, v in enumerate(self.game_mode_options)}
+        self._ai_difficulty_index = {v: i for i, v in enumerate(self.ai_difficulty_options)}
+
+        # Default settings (each stored as its index into the options list above)
+        self.board_size = DEFAULT_BOARD_SIZE
+        self.win_length = DEFAULT_WIN_LENGTH  # How many stones in a row to win
+        self.game_mode = (PLAYER_HUMAN, PLAYER_AI)  # Default: Human vs AI
+        self.ai_starts = False  # Default: Human starts
+        self.ai_difficulty = AI_NORMAL  # Default: Normal AI
+        self.animations_enabled = True  # Threat blinks, popups, placing animation (off with --fast)
+
+    def _option_index(self, setting_name, value):
+        """Returns the index of value in the setting's options; raises ValueError if it is not one."""
+        index = getattr(self, f"_{setting_name}_index").get(value)
+        if index is None:
+            raise ValueError(f"Invalid {setting_name} {value!r}")
+        return index
+
+    # Assigning a value that is not one of the options raises ValueError
+    @property
+    def board_size(self):
+        return self.board_size_options[self._board_size_idx]
+
+    @board_size.setter
+    def board_size(self, size):
+        self._board_size_idx = self._option_index("board_size", size)
+
+    @property
+    def win_length(self):
+        return self.win_length_options[self._win_length_idx]
+
+    @win_length.setter
+    def win_length(self, length):
+        self._win_length_idx = self._option_index("win_length", length)
+
+    @property
+    def game_mode(self):
+        return self.game_mode_options[self._game_mode_idx]
+
+    @game_mode.setter
+    def game_mode(self, mode_tuple):
+        self._game_mode_idx = self._option_index("game_mode", mode_tuple)
+
+    @property
+    def ai_difficulty(self):
+        return self.ai_difficulty_options[self._ai_difficulty_idx]
+
+    @ai_difficulty.setter
+    def ai_difficulty(self, difficulty):
+        self._ai_difficulty_idx = self._option_index("ai_difficulty", difficulty)
 
     def set_board_size(self, size):
         """Sets the board size if valid."""
-        if size in self.board_size_options:
+        if size in self._board_size_index:
             self.board_size = size
         else:
             print(
@@ -44,7 +103,7 @@ class Settings:
 
     def set_win_length(self, length):
         """Sets the win length if valid."""
-        if length in self.win_length_options:
+        if length in self._win_length_index:
             self.win_length = length
         else:
             print(
@@ -55,13 +114,7 @@ class Settings:
 
     def set_game_mode(self, mode_tuple):
         """Sets the game mode and determines if AI starts."""
-        # Basic check, could be more robust
-        if (
-            isinstance(mode_tuple, tuple)
-            and len(mode_tuple) == 2
-            and mode_tuple[0] in [PLAYER_HUMAN, PLAYER_AI]
-            and mode_tuple[1] in [PLAYER_HUMAN, PLAYER_AI]
-        ):
+        if mode_tuple in self._game_mode_index:
             # Determine if AI starts based on the first player
             self.ai_starts = mode_tuple[0] == PLAYER_AI
             self.game_mode = mode_tuple
@@ -72,7 +125,7 @@ class Settings:
 
     def set_ai_difficulty(self, difficulty):
         """Sets the AI difficulty if valid."""
-        if difficulty in self.ai_difficulty_options:
+        if difficulty in self._ai_difficulty_index:
             self.ai_difficulty = difficulty
         else:
             print(
@@ -81,23 +134,21 @@ class Settings:
             )
             self.ai_difficulty = AI_NORMAL
 
+    def cycle_option(self, setting_name, direction):
+        """Moves a setting to the next (direction 1) or previous (-1) option, wrapping around."""
+        options = getattr(self, f"{setting_name}_options")
+        index = (getattr(self, f"_{setting_name}_idx") + direction) % len(options)
+        # Through the setter so game mode changes also update ai_starts
+        getattr(self, f"set_{setting_name}")(options[index])
+
     def get_player_types(self):
         """Returns the tuple representing player types (e.g., ('human', 'ai'))."""
         return self.game_mode
 
     def get_setting_summary(self):
         """Returns a list of strings summarizing the current settings."""
-        mode_map = {
-            (PLAYER_HUMAN, PLAYER_HUMAN): "人間 vs 人間",
-            (PLAYER_HUMAN, PLAYER_AI):    "人間 vs AI",
-            (PLAYER_AI, PLAYER_HUMAN):    "AI vs 人間",
-            (PLAYER_AI, PLAYER_AI):        "AI vs AI",
-        }
-        difficulty_map = {
-            AI_EASY: "簡単",
-            AI_NORMAL: "普通",
-            AI_HARD: "難しい",
-        }
+        mode_map = self.MODE_SUMMARY_LABELS
+        difficulty_map = self.DIFFICULTY_SUMMARY_LABELS
         summary = [
             f"盤面サイズ: {self.board_size}x{self.board_size}",
             f"勝利条件: {self.win_length}目並び",
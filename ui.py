@@ -1,3 +1,5 @@
+# cython: language_level=3
+# Optionally compiled with `cythonize -i ui.py` (see README); the module stays plain Python.
 import pygame
 from constants import (
     BUTTON_COLOR,
@@ -11,6 +13,60 @@ from constants import (
 )
 
 
+_font_cache = {} # {(font file or None, size): pygame.font.Font}, shared by every screen
+
+def get_font(size, path=None):
+    """Returns the shared Font for (path, size), loading each font file and size only once.
+
+    path None is pygame's default font. Errors from loading a font file propagate
+    (and nothing is cached), so callers can fall back as before.
+    """
+    font = _font_cache.get((path, size))
+    if font is None:
+        font = pygame.font.Font(path, size)
+        _font_cache[(path, size)] = font
+    return font
+
+
+TEXT_CACHE_SIZE = 512 # Rendered labels kept; save file names make the key space open-ended
+_text_cache = {} # {(font, text, color): display-format text surface}, oldest first
+
+def render_text(font, text, color):
+    """Returns font's antialiased rendering of text, rasterizing each (font, text, color) once.
+
+    The surface is shared between callers, so it must not be modified (copy it first).
+    Needs the display mode to be set.
+    """
+    key = (font, text, tuple(color))
+    surface = _text_cache.get(key)
+    if surface is None:
+        surface = font.render(text, True, color).convert_alpha()
+        if len(_text_cache) >= TEXT_CACHE_SIZE:
+            del _text_cache[next(iter(_text_cache))] # Drop the oldest entry
+        _text_cache[key] = surface
+    return surface
+
+
+_button_background_cache = {} # {(size, color): rounded-rect fill + outline}, shared by same-sized buttons
+
+def _button_background(size, color):
+    """Returns the shared button background (rounded fill and outline) for this size and color."""
+    key = (tuple(size), tuple(color))
+    background = _button_background_cache.get(key)
+    if background is None:
+        background = pygame.Surface(size, pygame.SRCALPHA) # Rounded corners stay transparent
+        local_rect = background.get_rect()
+        pygame.draw.rect(background, color, local_rect, border_radius=5)
+        pygame.draw.rect(background, TEXT_COLOR, local_rect, 1, border_radius=5) # Outline
+        _button_background_cache[key] = background
+    return background
+
+
+def draw_buttons(screen, buttons):
+    """Draws several buttons with one Surface.blits call."""
+    screen.blits([button.blit_item() for button in buttons], doreturn=False)
+
+
 class Button:
     """A simple button class for Pygame UI."""
 
@@ -36,7 +92,7 @@ class Button:
         self.is_hovering = False
         self.data = data
 
-        self.text_surf = self.font.render(self.text, True, self.text_color)
+        self.text_surf = render_text(self.font, self.text, self.text_color)
 
         # Determine button rectangle
         if width is not None and height is not None:
@@ -62,13 +118,42 @@ class Button:
 
         # Center the text within the final button rectangle
         self.text_rect = self.text_surf.get_rect(center=self.rect.center)
+        self._render_images()
+
+    def set_text(self, text):
+        """Changes the label, re-rendering only if it differs. The button keeps its size."""
+        if text != self.text:
+            self.text = text
+            self.text_surf = render_text(self.font, self.text, self.text_color)
+            self.text_rect = self.text_surf.get_rect(center=self.rect.center)
+            self._render_images()
+
+    def _compose(self, color):
+        """Renders the whole button (fill, outline, label) into one surface."""
+        image = _button_background(self.rect.size, color).copy()
+        image.blit(self.text_surf, self.text_rect.move(-self.rect.x, -self.rect.y))
+        return image.convert_alpha() # Display pixel format, so each draw is a straight alpha blit
+
+    def _render_images(self):
+        """Pre-composes the normal and hover images (needs the display mode to be set)."""
+        self._images = { # {is_hovering: composed button surface}
+            False: self._compose(self.base_color),
+            True: self._compose(self.hover_color),
+        }
+        self.dirty = True # Looks different from what is on screen until drawn again
+
+    def get_dirty_rect(self):
+        """Returns the screen rect to repaint if the button changed since it was last drawn, else None."""
+        return self.rect if self.dirty else None
+
+    def blit_item(self):
+        """Returns (pre-composed normal or hover image, rect), ready for Surface.blits. Marks the button drawn."""
+        self.dirty = False
+        return self._images[self.is_hovering], self.rect
 
     def draw(self, screen):
-        """Draws the button on the screen."""
-        current_color = self.hover_color if self.is_hovering else self.base_color
-        pygame.draw.rect(screen, current_color, self.rect, border_radius=5)
-        pygame.draw.rect(screen, TEXT_COLOR, self.rect, 1, border_radius=5) # Outline
-        screen.blit(self.text_surf, self.text_rect)
+        """Draws the button on the screen (one blit of its pre-composed normal or hover image)."""
+        screen.blit(*self.blit_item())
 
     def handle_event(self, event):
         """
@@ -76,16 +161,51 @@ class Button:
         Returns data if set and clicked, else text.
         """
         if event.type == pygame.MOUSEMOTION:
-            self.is_hovering = self.rect.collidepoint(event.pos)
+            is_hovering = self.rect.collidepoint(event.pos)
+            if is_hovering != self.is_hovering:
+                self.is_hovering = is_hovering
+                self.dirty = True
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if self.is_hovering and event.button == 1:
-                # If data attribute exists and is not None, return it
-                if hasattr(self, 'data') and self.data is not None:
+                # If data is set, return it
+                if self.data is not None:
                     return self.data
                 else:
                     return self.text # Otherwise, return the button text
         return None
 
+class ButtonGroup:
+    """The buttons of one screen, hit-tested together. Buttons in a group must not overlap."""
+
+    def __init__(self, buttons):
+        self.buttons = list(buttons)
+        self._rects = [button.rect for button in self.buttons] # Same Rect objects, parallel to buttons
+        # Bounding box of all buttons: most mouse motion is outside it and skips the rect scan
+        self._bounds = self._rects[0].unionall(self._rects[1:]) if self._rects else pygame.Rect(0, 0, 0, 0)
+
+    def handle_event(self, event):
+        """Passes a mouse event only to the button under the cursor (one C-level rect scan).
+
+        Returns (button, result) when a button was clicked, else (None, None).
+        """
+        hit_button = None
+        if self._bounds.collidepoint(event.pos):
+            index = pygame.Rect(event.pos, (1, 1)).collidelist(self._rects)
+            if index != -1:
+                hit_button = self.buttons[index]
+        if event.type == pygame.MOUSEMOTION:
+            for button in self.buttons:
+                if button.is_hovering and button is not hit_button:
+                    button.is_hovering = False # The cursor left this button
+                    button.dirty = True
+            if hit_button is not None:
+                hit_button.handle_event(event)
+            return None, None
+        if hit_button is None:
+            return None, None
+        return hit_button, hit_button.handle_event(event)
+
+
 class Checkbox:
     """A simple checkbox class."""
     def __init__(self, text, pos, font, initial_state=False, size=20, text_color=TEXT_COLOR, check_color=BLACK):
@@ -102,22 +222,31 @@ class Checkbox:
         self.checkbox_rect = pygame.Rect(self.pos[0], self.pos[1], self.size, self.size)
 
         # Render text surface
-        self.text_surface = self.font.render(self.text, True, self.text_color)
+        self.text_surface = render_text(self.font, self.text, self.text_color)
         # Position text to the right of the checkbox
         self.text_rect = self.text_surface.get_rect(midleft=(self.checkbox_rect.right + 10, self.checkbox_rect.centery))
 
         # Define the clickable area (checkbox + text)
         self.clickable_area = self.checkbox_rect.union(self.text_rect)
 
+        # Screen area of the pre-rendered images (margin for the 2px checkmark lines at the box corners)
+        self.image_rect = self.clickable_area.inflate(4, 4)
+        self._images = {False: self._compose(False), True: self._compose(True)} # {checked: surface}
+
+    def _compose(self, checked):
+        """Renders the box, the checkmark if checked, and the label into one surface."""
+        image = pygame.Surface(self.image_rect.size, pygame.SRCALPHA)
+        box = self.checkbox_rect.move(-self.image_rect.x, -self.image_rect.y)
+        pygame.draw.rect(image, self.text_color, box, 1) # Box outline
+        if checked:
+            pygame.draw.line(image, self.check_color, box.topleft, box.bottomright, 2)
+            pygame.draw.line(image, self.check_color, box.topright, box.bottomleft, 2)
+        image.blit(self.text_surface, self.text_rect.move(-self.image_rect.x, -self.image_rect.y))
+        return image.convert_alpha()
+
     def draw(self, screen):
-        # Draw the box
-        pygame.draw.rect(screen, self.text_color, self.checkbox_rect, 1) # Box outline
-        # Draw the checkmark if checked
-        if self.checked:
-            pygame.draw.line(screen, self.check_color, self.checkbox_rect.topleft, self.checkbox_rect.bottomright, 2)
-            pygame.draw.line(screen, self.check_color, self.checkbox_rect.topright, self.checkbox_rect.bottomleft, 2)
-        # Draw the text label
-        screen.blit(self.text_surface, self.text_rect)
+        """Draws the checkbox (one blit of its pre-rendered checked or unchecked image)."""
+        screen.blit(self._images[self.checked], self.image_rect)
 
     def handle_event(self, event):
         """Handles mouse events. Returns True if state changed, False otherwise."""
@@ -132,6 +261,12 @@ class Checkbox:
         return state_changed
 
 
+# Telop.state values
+TELOP_IDLE = 0
+TELOP_VISIBLE = 1
+TELOP_FADING_OUT = 2
+
+
 class Telop:
     """Displays temporary, animated text notifications (like a toast/telop)."""
     def __init__(self, screen_width, center_pos, font, fade_duration=500, bg_color=(0, 0, 0, 180), text_color=WHITE):
@@ -139,30 +274,35 @@ class Telop:
         self.center_pos = center_pos
         self.font = font
         self.fade_duration = fade_duration
+        self._alpha_step = (255 << 16) // max(1, fade_duration) # Fade-out alpha per ms in 16.16 fixed point (0: no fade)
         self.bg_color = bg_color # Should have 4 components (R, G, B, A)
         self.text_color = text_color
 
         self.text = ""
         self.duration = 0 # How long to stay fully visible (ms). None means indefinite.
         self.active = False
-        self.state = 'idle' # idle, fading_in, visible, fading_out
+        self.state = TELOP_IDLE # TELOP_IDLE, TELOP_VISIBLE or TELOP_FADING_OUT
         self.start_time = 0
         self.current_alpha = 0
         self.text_surface = None
         self.text_rect = None
         self.bg_rect = None
+        self._composited = None # Background + text, composed once per show()
 
     def show(self, text, duration): # duration in ms, None for indefinite
         """Starts showing the telop with the given text and duration. Appears instantly."""
+        same_text = text == self.text and self._composited is not None
         self.text = text
         self.duration = duration
         self.active = True
-        self.state = 'visible' # <<< Start directly in visible state
+        self.state = TELOP_VISIBLE # <<< Start directly in visible state
         self.start_time = pygame.time.get_ticks() # For duration tracking
         self.current_alpha = 255 # <<< Appear instantly
+        if same_text:
+            return # e.g. "思考中..." before every AI move: the composed surface is still valid
 
         # 1. Pre-render text to get its size
-        self.text_surface = self.font.render(self.text, True, self.text_color)
+        self.text_surface = render_text(self.font, self.text, self.text_color)
         temp_text_rect = self.text_surface.get_rect()
 
         # 2. Calculate background rect (full width, height based on text + padding)
@@ -174,41 +314,46 @@ class Telop:
         # 3. Center the text rect within the new background rect
         self.text_rect = self.text_surface.get_rect(center=self.bg_rect.center)
 
+        # 4. Compose background and text once; fading only changes the surface alpha at blit time
+        composited = pygame.Surface(self.bg_rect.size, pygame.SRCALPHA)
+        composited.fill(self.bg_color)
+        composited.blit(self.text_surface, (self.text_rect.left - self.bg_rect.left,
+                                            self.text_rect.top - self.bg_rect.top))
+        self._composited = composited.convert_alpha()
+
     def hide(self):
         """Starts the fade-out animation if the telop is active."""
         # Only start fading out if currently visible
-        if self.active and self.state == 'visible':
-            self.state = 'fading_out'
+        if self.active and self.state == TELOP_VISIBLE:
+            self.state = TELOP_FADING_OUT
             self.start_time = pygame.time.get_ticks()
             # Alpha is already 255, will fade from there
 
-    def update(self):
-        """Updates the animation state and alpha. Returns True if active."""
+    def update(self, now):
+        """Updates the animation state and alpha for time now (pygame ticks). Returns True if active."""
         if not self.active:
             return False
 
-        now = pygame.time.get_ticks()
         elapsed = now - self.start_time
 
         # Removed fading_in state logic
 
-        if self.state == 'visible':
+        if self.state == TELOP_VISIBLE:
             # print(f"DEBUG Telop.update: Visible - elapsed={elapsed}, duration={self.duration}") # Comment out
             if self.duration is not None and elapsed >= self.duration:
-                self.state = 'fading_out'
+                self.state = TELOP_FADING_OUT
                 self.start_time = now # Reset timer for fade out
                 # print("DEBUG Telop.update: Visible -> Fading Out") # Comment out
 
-        elif self.state == 'fading_out':
+        elif self.state == TELOP_FADING_OUT:
             if elapsed >= self.fade_duration:
                 self.current_alpha = 0
-                self.state = 'idle'
+                self.state = TELOP_IDLE
                 self.active = False
                 # print("DEBUG Telop.update: Fading Out -> Idle") # Comment out
             else:
-                # Ensure alpha calculation is correct when starting fade-out
-                self.current_alpha = int(255 * (1 - (elapsed / self.fade_duration)))
-                self.current_alpha = max(0, min(255, self.current_alpha))
+                # 0 <= elapsed < fade_duration here, so the alpha stays within 1..255
+                self.current_alpha = 255 - ((elapsed * self._alpha_step) >> 16)
                 # print(f"DEBUG Telop.update: Fading Out - elapsed={elapsed}, alpha={self.current_alpha}") # Comment out
 
         # Clamp alpha just in case (though should be handled above)
@@ -217,100 +362,85 @@ class Telop:
 
     def draw(self, screen):
         """Draws the telop onto the screen with current alpha."""
-        # print(f"DEBUG Telop.draw: active={self.active}, state={self.state}, alpha={self.current_alpha}, text='{self.text}'") # Comment out
-
-        if not self.active or self.current_alpha == 0 or not self.text_surface:
-            # print("DEBUG Telop.draw: Condition met to not draw.") # Comment out
+        if not self.active or self.current_alpha == 0 or not self._composited:
             return
 
-        # Create background surface with SRCALPHA
-        bg_surface = pygame.Surface(self.bg_rect.size, pygame.SRCALPHA)
-
-        # Calculate combined alpha for background fill
-        # Background has its own alpha (bg_color[3]) modulated by fade alpha (current_alpha)
-        combined_bg_alpha = int(self.bg_color[3] * (self.current_alpha / 255))
-        fill_color = (*self.bg_color[:3], combined_bg_alpha)
-        bg_surface.fill(fill_color)
-
-        # Blit the text surface (copy) with fade alpha onto the background surface
-        temp_text_surface = self.text_surface.copy()
-        temp_text_surface.set_alpha(self.current_alpha)
-        text_blit_pos = (self.text_rect.left - self.bg_rect.left,
-                         self.text_rect.top - self.bg_rect.top)
-        bg_surface.blit(temp_text_surface, text_blit_pos)
+        # Surface alpha scales the per-pixel alpha of background and text together
+        self._composited.set_alpha(self.current_alpha)
+        screen.blit(self._composited, self.bg_rect.topleft)
 
-        # Blit the final combined surface onto the main screen
-        screen.blit(bg_surface, self.bg_rect.topleft)
 
-
-class TextPopup:
-    """Displays temporary text near a specific location."""
+class TextPopup(pygame.sprite.Sprite):
+    """Displays temporary text near a specific location (a sprite, drawn via its Group)."""
     def __init__(self, text, target_pos, font, duration=1000, color=WHITE, offset_y=-30):
+        super().__init__()
         self.text = text
         self.target_pos = target_pos # Center position of the target stone (pixels)
         self.font = font
-        self.duration = float(duration) # Use float for division
+        self.duration = int(duration) # ms; the fade is computed in integers
         self.color = color
         self.initial_offset_y = offset_y # Starting vertical offset
         self.fade_move_distance = 20 # How many pixels it moves up during fade
+        self._alpha_step = (255 << 16) // max(1, self.duration) # Fade-out alpha per ms in 16.16 fixed point (0: no fade)
 
         self.active = False
-        self.start_time = 0.0
-        self.text_surface = None
+        self.start_time = 0
+        # Own copy of the shared rendering: fading changes this surface's alpha at blit time
+        self.text_surface = render_text(self.font, self.text, self.color).copy()
         self.text_rect = None
-        self.current_alpha = 255.0
+        self.current_alpha = 255
         self.current_offset_y = self.initial_offset_y
+        # Sprite attributes used by pygame.sprite.Group.draw
+        self.image = self.text_surface
+        self.rect = self.text_surface.get_rect()
 
     def show(self):
         """Activates the popup."""
-        self.text_surface = self.font.render(self.text, True, self.color)
         # Position the text centered horizontally, offset vertically
         popup_center_x = self.target_pos[0]
         popup_center_y = self.target_pos[1] + self.initial_offset_y # Use initial offset
         self.text_rect = self.text_surface.get_rect(center=(popup_center_x, popup_center_y))
-        self.start_time = float(pygame.time.get_ticks())
-        self.current_alpha = 255.0
+        self.rect = self.text_rect # Same Rect object, so moving text_rect moves the sprite
+        self.image.set_alpha(255)
+        self.start_time = pygame.time.get_ticks()
+        self.current_alpha = 255
         self.current_offset_y = self.initial_offset_y
         self.active = True
 
-    def update(self):
-        """Updates animation (fade out and move up). Returns False if duration passed."""
+    def update(self, now):
+        """Updates animation (fade out and move up) for time now (pygame ticks). Returns False if duration passed."""
         if not self.active:
             return False
 
-        now = float(pygame.time.get_ticks())
         elapsed = now - self.start_time
 
         if elapsed >= self.duration:
             self.active = False
+            self.kill() # Remove from every Group holding this popup
             return False
         else:
-            # Calculate progress (0.0 to 1.0)
-            progress = elapsed / self.duration
-
-            # Update alpha (linear fade out)
-            self.current_alpha = 255.0 * (1.0 - progress)
-            self.current_alpha = max(0.0, min(255.0, self.current_alpha)) # Clamp alpha
+            # Update alpha (linear fade out; 0 <= elapsed < duration keeps it within 0..255)
+            self.current_alpha = 255 - ((elapsed * self._alpha_step) >> 16)
 
             # Update vertical offset (linear move up)
-            self.current_offset_y = self.initial_offset_y - (self.fade_move_distance * progress)
+            self.current_offset_y = self.initial_offset_y - (self.fade_move_distance * elapsed) // self.duration
 
             # Update the rect position based on the current offset
             popup_center_x = self.target_pos[0]
             popup_center_y = self.target_pos[1] + self.current_offset_y
             if self.text_rect: # Ensure text_rect exists before moving
                 self.text_rect.center = (popup_center_x, popup_center_y)
+            # Surface alpha is applied per blit, so no copy is needed
+            self.image.set_alpha(self.current_alpha)
 
             return True
 
     def draw(self, screen):
         """Draws the text popup if active with current alpha and position."""
         if self.active and self.text_surface and self.text_rect:
-            # Create a temporary surface to apply alpha correctly
-            temp_surface = self.text_surface.copy()
-            temp_surface.set_alpha(int(self.current_alpha))
+            # Alpha is already set on the surface by update()
             # Optional: Add background later if needed
-            screen.blit(temp_surface, self.text_rect)
+            screen.blit(self.text_surface, self.text_rect)
 
     def adjust_position(self, dy):
         """Adjusts the vertical position (for stacking)."""